@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# STL core library: classifier, SAD accounting, debounced baseline, stable
+# operators and manifests over in-memory sequences. Standard library only.
+#
+# The scripts in scripts/ are thin CLI wrappers around these functions and
+# produce byte-identical artifacts. Put scripts/ on sys.path to import it:
+#
+#   from stl_core import classify
+#   deltas, rs, ss, states, collapses = classify(ts, ds, W=10, tau_s=0.95, tau_l=0.05, eps=0.01)
+
+from stl_core.debounce import debounced_boolean, negctl_events, write_negctl_report
+from stl_core.manifest import (
+    HashingFileIO,
+    MANIFEST_NAME,
+    manifest_lines,
+    open_hashed,
+    sha256_file,
+    write_manifest,
+    written_sha256,
+)
+from stl_core.operators import (
+    AND_bool,
+    AND_s,
+    NOT_bool,
+    NOT_s,
+    OR_bool,
+    OR_s,
+    operator_preservation_checks,
+    write_operator_preservation,
+)
+from stl_core.sad import PHI_TO_BOOL, bool_from_d, sad_accounting, sad_events, write_sad_report
+from stl_core.t5 import (
+    PHI_ALL,
+    T5_ALL,
+    T5_EMINUS,
+    T5_EPLUS,
+    T5_S,
+    T5_Z0,
+    T5_ZSTAR,
+    TRACE_HEADER,
+    StabilityRunLength,
+    StreamingT5Classifier,
+    classify,
+    classify_state,
+    count_states,
+    phi_T,
+    validate_params,
+    write_summary,
+    write_trace_csv,
+)
+
+__all__ = [
+    "AND_bool",
+    "AND_s",
+    "HashingFileIO",
+    "MANIFEST_NAME",
+    "NOT_bool",
+    "NOT_s",
+    "OR_bool",
+    "OR_s",
+    "PHI_ALL",
+    "PHI_TO_BOOL",
+    "StabilityRunLength",
+    "StreamingT5Classifier",
+    "T5_ALL",
+    "T5_EMINUS",
+    "T5_EPLUS",
+    "T5_S",
+    "T5_Z0",
+    "T5_ZSTAR",
+    "TRACE_HEADER",
+    "bool_from_d",
+    "classify",
+    "classify_state",
+    "count_states",
+    "debounced_boolean",
+    "manifest_lines",
+    "negctl_events",
+    "open_hashed",
+    "operator_preservation_checks",
+    "phi_T",
+    "sad_accounting",
+    "sad_events",
+    "sha256_file",
+    "validate_params",
+    "write_manifest",
+    "write_negctl_report",
+    "write_operator_preservation",
+    "write_sad_report",
+    "write_summary",
+    "write_trace_csv",
+    "written_sha256",
+]
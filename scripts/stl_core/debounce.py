@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# Classical stability-gated (debounced) Boolean baseline + the SAD negative
+# control built on it: when the Boolean already enforces stability, STL should
+# show no extra advantage. Expected: SAD(P) = 0.
+
+import csv
+import os
+
+from stl_core.manifest import open_hashed, write_manifest, written_sha256
+
+NEGCTL_REPORT_FILES = [
+    "SAD_TABLE_I2_RUN_DECLARATION.csv",
+    "SAD_TABLE_I3_EVENT_ACCOUNTING.csv",
+    "SAD_TABLE_I4_EVENT_TIMING.csv",
+    "summary.txt",
+]
+
+def debounced_boolean(d_vals, W, tau_s, tau_l):
+    # Returns dict[t] -> {"TRUE","FALSE","UNDEFINED"} (UNDEFINED = no new stable decision yet)
+    # but we also keep the held stable value separately.
+    # Classical debounce:
+    # - enter TRUE only after W consecutive d>=tau_s
+    # - enter FALSE only after W consecutive d<=tau_l
+    # - otherwise hold last stable boolean state
+    out = {}
+    hold = "FALSE"  # initial default; conservative start
+    # Counters
+    c_hi = 0
+    c_lo = 0
+    for (t, d) in d_vals:
+        if d >= tau_s:
+            c_hi += 1
+        else:
+            c_hi = 0
+        if d <= tau_l:
+            c_lo += 1
+        else:
+            c_lo = 0
+
+        if c_hi >= W:
+            hold = "TRUE"
+        elif c_lo >= W:
+            hold = "FALSE"
+
+        out[t] = hold
+    return out
+
+def negctl_events(d_vals, phi_by_t: dict, W: int, tau_s: float, tau_l: float, event_on: str) -> tuple:
+    # d_vals: [(t, d)]; phi_by_t: t -> "TRUE" / "FALSE" / other (UNDEFINED)
+    # Returns (E_bool, E_prem, E_aligned, SAD, timing_rows).
+    bool_by_t = debounced_boolean(d_vals, W, tau_s, tau_l)
+
+    # Event detection on debounced boolean
+    events = []
+    prev = None
+    for (t, _) in d_vals:
+        cur = bool_by_t[t]
+        if prev is None:
+            prev = cur
+            continue
+        if event_on == "enter_true" and prev != "TRUE" and cur == "TRUE":
+            events.append(t)
+        if event_on == "enter_false" and prev != "FALSE" and cur == "FALSE":
+            events.append(t)
+        prev = cur
+
+    E_bool = len(events)
+    E_prem = 0
+    E_aligned = 0
+
+    timing_rows = []
+    for idx, t_bool in enumerate(events, start=1):
+        # STL collapse at same t if phi_T is TRUE/FALSE and matches event direction
+        phi = phi_by_t.get(t_bool, "").upper()
+        want = "TRUE" if event_on == "enter_true" else "FALSE"
+
+        if phi == want:
+            E_aligned += 1
+            delta = 0
+            timing_rows.append((idx, t_bool, t_bool, delta, "ALIGNED"))
+        else:
+            # In negative control, this should not happen; would indicate premature bool (or mismatch)
+            E_prem += 1
+            timing_rows.append((idx, t_bool, "", "", "PREMATURE_OR_MISMATCH"))
+
+    SAD = 0.0 if E_bool == 0 else (E_prem / E_bool)
+    return E_bool, E_prem, E_aligned, SAD, timing_rows
+
+def write_negctl_report(out_dir: str, args, result: tuple, adapter_sha256: str, trace_sha256: str) -> list:
+    # args: run declaration (dataset_name, dataset_source, adapter_name, proposition,
+    # naive_rule, W, tau_s, tau_l, eps)
+    E_bool, E_prem, E_aligned, SAD, timing_rows = result
+
+    digests = {}
+
+    # TABLE I.2
+    t2_path = os.path.join(out_dir, "SAD_TABLE_I2_RUN_DECLARATION.csv")
+    with open_hashed(t2_path, newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["field", "value"])
+        w.writerow(["dataset_name", args.dataset_name])
+        w.writerow(["dataset_source", args.dataset_source])
+        w.writerow(["adapter_name", args.adapter_name])
+        w.writerow(["proposition", args.proposition])
+        w.writerow(["naive_rule", args.naive_rule])
+        w.writerow(["W", args.W])
+        w.writerow(["tau_s", args.tau_s])
+        w.writerow(["tau_l", args.tau_l])
+        w.writerow(["eps", args.eps])
+        w.writerow(["adapter_csv_sha256", adapter_sha256])
+        w.writerow(["trace_csv_sha256", trace_sha256])
+    digests[os.path.basename(t2_path)] = written_sha256(f)
+
+    # TABLE I.3
+    t3_path = os.path.join(out_dir, "SAD_TABLE_I3_EVENT_ACCOUNTING.csv")
+    with open_hashed(t3_path, newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["E_bool", "E_prem", "E_aligned", "SAD(P)"])
+        w.writerow([E_bool, E_prem, E_aligned, f"{SAD:.6f}"])
+    digests[os.path.basename(t3_path)] = written_sha256(f)
+
+    # TABLE I.4 (timing)
+    t4_path = os.path.join(out_dir, "SAD_TABLE_I4_EVENT_TIMING.csv")
+    with open_hashed(t4_path, newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["i", "t_bool(i)", "t_stl(i)", "delta_i", "status"])
+        for row in timing_rows:
+            w.writerow(list(row))
+    digests[os.path.basename(t4_path)] = written_sha256(f)
+
+    summary_path = os.path.join(out_dir, "summary.txt")
+    with open_hashed(summary_path, newline="\n") as f:
+        f.write("SAD Negative Control Report (Debounced Boolean)\n")
+        f.write("Goal: show SAD(P)=0 when classical Boolean already enforces stability.\n")
+        f.write(f"E_bool={E_bool} E_prem={E_prem} E_aligned={E_aligned} SAD(P)={SAD:.6f}\n")
+        f.write("If SAD(P) > 0 here, the negative control failed and requires investigation.\n")
+    digests[os.path.basename(summary_path)] = written_sha256(f)
+
+    write_manifest(out_dir, NEGCTL_REPORT_FILES, digests)
+    return list(NEGCTL_REPORT_FILES)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# SHA-256 file hashing + MANIFEST.sha256 writing ("<sha256>  <rel>" lines,
+# sorted by relative path, LF line endings).
+
+import concurrent.futures
+import hashlib
+import io
+import mmap
+import os
+
+MANIFEST_NAME = "MANIFEST.sha256"
+
+class HashingFileIO(io.FileIO):
+    # Write-only file that feeds every byte written into a SHA-256 digest.
+    def __init__(self, path: str):
+        super().__init__(path, "w")
+        self.sha = hashlib.sha256()
+
+    def write(self, b) -> int:
+        n = super().write(b)
+        if n:
+            self.sha.update(memoryview(b).cast("B")[:n])
+        return n
+
+    def hexdigest(self) -> str:
+        return self.sha.hexdigest()
+
+def open_hashed(path: str, newline: str = "") -> io.TextIOWrapper:
+    # Same as open(path, "w", encoding="utf-8", newline=newline); after close,
+    # written_sha256(f) is the file's SHA-256 without reading it back.
+    return io.TextIOWrapper(io.BufferedWriter(HashingFileIO(path)), encoding="utf-8", newline=newline)
+
+def written_sha256(f: io.TextIOWrapper) -> str:
+    return f.buffer.raw.hexdigest()
+
+def sha256_file(path: str, use_mmap: bool = False) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        else:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+def manifest_lines(out_dir: str, rel_paths: list, known_digests: dict = None,
+                   jobs: int = 1, use_mmap: bool = False) -> list:
+    # known_digests: rel -> sha256 already computed while writing (skips a re-read)
+    # jobs > 1 hashes files on a thread pool (hashlib releases the GIL on large
+    # updates); lines are still emitted in sorted order.
+    rels = sorted(rel_paths)
+    todo = [rel for rel in rels if not (known_digests and rel in known_digests)]
+    paths = [os.path.join(out_dir, rel) for rel in todo]
+    if jobs > 1 and len(paths) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(jobs, len(paths))) as ex:
+            hashed = list(ex.map(lambda p: sha256_file(p, use_mmap), paths))
+    else:
+        hashed = [sha256_file(p, use_mmap) for p in paths]
+    digests = dict(known_digests or {})
+    digests.update(zip(todo, hashed))
+    return [f"{digests[rel]}  {rel.replace(os.sep, '/')}" for rel in rels]
+
+def write_manifest(out_dir: str, rel_paths: list, known_digests: dict = None,
+                   jobs: int = 1, use_mmap: bool = False) -> str:
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    lines = manifest_lines(out_dir, rel_paths, known_digests, jobs, use_mmap)
+    with open(manifest_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(lines) + "\n")
+    return manifest_path
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Stable-endpoint operators NOT_s / AND_s / OR_s and the operator
+# preservation check phi_T(op_s(...)) == op_bool(phi_T(...)) on {S, Zstar}.
+
+import csv
+import os
+
+from stl_core.manifest import open_hashed, write_manifest, written_sha256
+from stl_core.t5 import T5_S, T5_ZSTAR, phi_T
+
+OPERATOR_PRESERVATION_FILES = ["operator_preservation_v1_3.csv", "summary.txt"]
+
+def NOT_bool(x: str) -> str:
+    return "FALSE" if x == "TRUE" else "TRUE"
+
+def AND_bool(a: str, b: str) -> str:
+    return "TRUE" if (a == "TRUE" and b == "TRUE") else "FALSE"
+
+def OR_bool(a: str, b: str) -> str:
+    return "TRUE" if (a == "TRUE" or b == "TRUE") else "FALSE"
+
+def NOT_s(a: str) -> str:
+    if a == T5_S:
+        return T5_ZSTAR
+    if a == T5_ZSTAR:
+        return T5_S
+    return a
+
+def AND_s(a: str, b: str) -> str:
+    # Stable endpoint table (conservative):
+    if a == T5_ZSTAR or b == T5_ZSTAR:
+        return T5_ZSTAR
+    return T5_S
+
+def OR_s(a: str, b: str) -> str:
+    # Stable endpoint table (conservative):
+    if a == T5_S or b == T5_S:
+        return T5_S
+    return T5_ZSTAR
+
+def operator_preservation_checks() -> tuple:
+    # Returns (rows, fails): one row per check, plus failure descriptions.
+    stable = [T5_S, T5_ZSTAR]
+
+    rows = []
+    fails = []
+
+    # NOT test
+    for A in stable:
+        phiA = phi_T(A)
+        lhs = phi_T(NOT_s(A))
+        rhs = NOT_bool(phiA)
+        ok = (lhs == rhs)
+        rows.append(["NOT", A, "", lhs, rhs, "PASS" if ok else "FAIL"])
+        if not ok:
+            fails.append(f"NOT fail: A={A} lhs={lhs} rhs={rhs}")
+
+    # AND test
+    for A in stable:
+        for B in stable:
+            phiA = phi_T(A)
+            phiB = phi_T(B)
+            lhs = phi_T(AND_s(A, B))
+            rhs = AND_bool(phiA, phiB)
+            ok = (lhs == rhs)
+            rows.append(["AND", A, B, lhs, rhs, "PASS" if ok else "FAIL"])
+            if not ok:
+                fails.append(f"AND fail: A={A} B={B} lhs={lhs} rhs={rhs}")
+
+    # OR test
+    for A in stable:
+        for B in stable:
+            phiA = phi_T(A)
+            phiB = phi_T(B)
+            lhs = phi_T(OR_s(A, B))
+            rhs = OR_bool(phiA, phiB)
+            ok = (lhs == rhs)
+            rows.append(["OR", A, B, lhs, rhs, "PASS" if ok else "FAIL"])
+            if not ok:
+                fails.append(f"OR fail: A={A} B={B} lhs={lhs} rhs={rhs}")
+
+    return rows, fails
+
+def write_operator_preservation(out_dir: str) -> list:
+    out_csv = os.path.join(out_dir, "operator_preservation_v1_3.csv")
+    summary = os.path.join(out_dir, "summary.txt")
+    rows, fails = operator_preservation_checks()
+
+    digests = {}
+    with open_hashed(out_csv, newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["op", "A", "B", "lhs_phi_T(op_s(...))", "rhs_op_bool(phi_T(...))", "result"])
+        for r in rows:
+            w.writerow(r)
+    digests[os.path.basename(out_csv)] = written_sha256(f)
+
+    with open_hashed(summary, newline="\n") as f:
+        f.write("STL OPERATOR PRESERVATION v1.3\n")
+        f.write("Domain: stable endpoint homomorphism check\n")
+        f.write("Stable set: {S, Zstar}\n")
+        f.write(f"Total checks: {len(rows)}\n")
+        f.write(f"FAIL count: {len(fails)}\n")
+        if fails:
+            f.write("Failures:\n")
+            for line in fails:
+                f.write(f"  {line}\n")
+        else:
+            f.write("All checks: PASS\n")
+    digests[os.path.basename(summary)] = written_sha256(f)
+
+    write_manifest(out_dir, OPERATOR_PRESERVATION_FILES, digests)
+    return list(OPERATOR_PRESERVATION_FILES)
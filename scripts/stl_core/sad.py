@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+#
+# SAD(P) accounting over in-memory sequences (Appendix G/I aligned):
+#   SAD(P) = E_premature / E_total
+#
+# where an event is a naive Boolean state change at t_bool, and
+# "premature" means STL does NOT collapse to the new Boolean truth at t_bool
+# (i.e., STL is UNDEFINED or the opposite at that exact time).
+
+import csv
+import os
+from typing import Dict, List, Optional, Tuple
+
+from stl_core.manifest import open_hashed, write_manifest, written_sha256
+
+SAD_REPORT_FILES = [
+    "SAD_TABLE_I2_RUN_DECLARATION.csv",
+    "SAD_TABLE_I3_EVENT_ACCOUNTING.csv",
+    "SAD_TABLE_I4_EVENT_TIMING.csv",
+    "summary.txt",
+]
+
+TIMING_FIELDS = [
+    "event_index", "event_type", "t_bool", "bool_after",
+    "stl_at_t_bool", "t_stl", "delta", "premature_boolean", "aligned"
+]
+
+
+def bool_from_d(d: float, mode: str, threshold: float) -> bool:
+    # mode:
+    #   "ge" => TRUE if d >= threshold
+    #   "gt" => TRUE if d >  threshold
+    #   "le" => TRUE if d <= threshold
+    #   "lt" => TRUE if d <  threshold
+    if mode == "ge":
+        return d >= threshold
+    if mode == "gt":
+        return d > threshold
+    if mode == "le":
+        return d <= threshold
+    if mode == "lt":
+        return d < threshold
+    raise ValueError(f"Unsupported --bool_mode: {mode}")
+
+
+# phi_T codes from read_csv_columns: TRUE / FALSE / UNDEFINED (or missing)
+PHI_TO_BOOL = {1: True, 0: False, -1: None}
+
+
+def find_first_stl_collapse_at_or_after(
+    idx_start: int,
+    desired: bool,
+    phi_seq: List[Optional[bool]],
+    t_seq: List[int],
+) -> Optional[int]:
+    # Return time t where phi becomes desired first time at/after idx_start, else None
+    for j in range(idx_start, len(phi_seq)):
+        if phi_seq[j] is not None and phi_seq[j] == desired:
+            return t_seq[j]
+    return None
+
+
+def sad_events(
+    t_seq: List[int],
+    d_seq: List[float],
+    phi_seq: List[Optional[bool]],
+    bool_mode: str,
+    threshold: float,
+    event_on: str,
+) -> List[Dict[str, object]]:
+    # phi_seq: STL collapse per row (True / False / None = UNDEFINED), aligned with t_seq / d_seq
+    bool_seq: List[bool] = [bool_from_d(d, bool_mode, threshold) for d in d_seq]
+
+    # Identify Boolean threshold events = any naive Boolean state change
+    events: List[Dict[str, object]] = []
+    for i in range(1, len(bool_seq)):
+        prev_b = bool_seq[i - 1]
+        cur_b = bool_seq[i]
+        if prev_b == cur_b:
+            continue
+
+        if (not prev_b) and cur_b:
+            ev_type = "enter_true"
+        elif prev_b and (not cur_b):
+            ev_type = "enter_false"
+        else:
+            ev_type = "any_change"
+
+        if event_on != "any_change" and ev_type != event_on:
+            continue
+
+        t_bool = t_seq[i]
+        desired = cur_b  # new Boolean truth after crossing
+
+        # STL collapse status AT t_bool (i.e., at same index i)
+        stl_at_bool = phi_seq[i]  # None = UNDEFINED
+
+        aligned = (stl_at_bool is not None and stl_at_bool == desired)
+
+        # SPEC-CORRECT: premature iff NOT aligned at the threshold instant
+        premature = not aligned
+
+        # Timing: first time at/after threshold when STL collapses to desired (if ever)
+        t_stl = find_first_stl_collapse_at_or_after(i, desired, phi_seq, t_seq)
+
+        events.append({
+            "event_index": len(events) + 1,
+            "event_type": ev_type,
+            "t_bool": t_bool,
+            "bool_after": "TRUE" if desired else "FALSE",
+            "stl_at_t_bool": "" if stl_at_bool is None else ("TRUE" if stl_at_bool else "FALSE"),
+            "t_stl": "" if t_stl is None else t_stl,
+            "delta": "" if t_stl is None else (t_stl - t_bool),
+            "premature_boolean": "YES" if premature else "NO",
+            "aligned": "YES" if aligned else "NO",
+        })
+
+    return events
+
+
+def sad_accounting(events: List[Dict[str, object]]) -> Tuple[int, int, int, Optional[float]]:
+    E_total = len(events)
+    E_premature = sum(1 for e in events if e["premature_boolean"] == "YES")
+    E_aligned = sum(1 for e in events if e["aligned"] == "YES")
+
+    # SPEC-CORRECT SAD
+    sad: Optional[float] = None
+    if E_total > 0:
+        sad = (E_premature / float(E_total))
+
+    return E_total, E_premature, E_aligned, sad
+
+
+def write_sad_report(out_dir: str, args, events: List[Dict[str, object]]) -> List[str]:
+    # args: run declaration (dataset_name, dataset_source, adapter_name, proposition,
+    # naive_rule, bool_mode, threshold, event_on, W, tau_s, tau_l, eps, adapter_csv, trace_csv)
+    E_total, E_premature, E_aligned, sad = sad_accounting(events)
+
+    digests = {}
+
+    # Table I.2 — Dataset/Run Declaration
+    table_i2_path = os.path.join(out_dir, "SAD_TABLE_I2_RUN_DECLARATION.csv")
+    with open_hashed(table_i2_path, newline="\n") as f:
+        w = csv.writer(f)
+        w.writerow(["field", "value"])
+        w.writerow(["dataset_name", args.dataset_name])
+        w.writerow(["dataset_source", args.dataset_source])
+        w.writerow(["adapter_name", args.adapter_name])
+        w.writerow(["proposition_P", args.proposition])
+        w.writerow(["naive_boolean_rule", args.naive_rule])
+        w.writerow(["parameters_W", args.W])
+        w.writerow(["parameters_tau_s", args.tau_s])
+        w.writerow(["parameters_tau_l", args.tau_l])
+        w.writerow(["parameters_eps", args.eps])
+        w.writerow(["bool_mode", args.bool_mode])
+        w.writerow(["threshold_on_d_t", args.threshold])
+        w.writerow(["event_counting_mode", args.event_on])
+        w.writerow(["adapter_csv", os.path.basename(args.adapter_csv)])
+        w.writerow(["trace_csv", os.path.basename(args.trace_csv)])
+    digests[os.path.basename(table_i2_path)] = written_sha256(f)
+
+    # Table I.3 — Event-Level SAD Accounting
+    table_i3_path = os.path.join(out_dir, "SAD_TABLE_I3_EVENT_ACCOUNTING.csv")
+    with open_hashed(table_i3_path, newline="\n") as f:
+        w = csv.writer(f)
+        w.writerow(["E_total", "E_premature", "E_aligned", "SAD(P)"])
+        w.writerow([E_total, E_premature, E_aligned, "" if sad is None else f"{sad:.6f}"])
+    digests[os.path.basename(table_i3_path)] = written_sha256(f)
+
+    # Table I.4 — Timing-Based (Optional but Recommended)
+    table_i4_path = os.path.join(out_dir, "SAD_TABLE_I4_EVENT_TIMING.csv")
+    with open_hashed(table_i4_path, newline="\n") as f:
+        w = csv.DictWriter(f, fieldnames=TIMING_FIELDS)
+        w.writeheader()
+        for e in events:
+            w.writerow({k: e.get(k, "") for k in TIMING_FIELDS})
+    digests[os.path.basename(table_i4_path)] = written_sha256(f)
+
+    # Summary
+    summary_path = os.path.join(out_dir, "summary.txt")
+    with open_hashed(summary_path, newline="\n") as f:
+        f.write("SAD(P) REPORT (Audit-Grade)\n")
+        f.write("----------------------------------------\n")
+        f.write(f"dataset_name: {args.dataset_name}\n")
+        f.write(f"adapter_name: {args.adapter_name}\n")
+        f.write(f"proposition_P: {args.proposition}\n")
+        f.write(f"naive_boolean_rule: {args.naive_rule}\n")
+        f.write(f"bool_mode: {args.bool_mode}\n")
+        f.write(f"threshold_on_d_t: {args.threshold}\n")
+        f.write(f"event_counting_mode: {args.event_on}\n")
+        f.write("\n")
+        f.write("parameters:\n")
+        f.write(f"  W={args.W} tau_s={args.tau_s} tau_l={args.tau_l} eps={args.eps}\n")
+        f.write("\n")
+        f.write("event accounting:\n")
+        f.write(f"  E_total={E_total}\n")
+        f.write(f"  E_premature={E_premature}\n")
+        f.write(f"  E_aligned={E_aligned}\n")
+        f.write(f"  SAD(P)={'NA' if sad is None else f'{sad:.6f}'}\n")
+        f.write("\n")
+        f.write("definition (Appendix G/I):\n")
+        f.write("  SAD(P) = E_premature / E_total\n")
+        f.write("\n")
+        f.write("notes:\n")
+        f.write("  - A 'threshold event' is a naive Boolean state change at time t_bool.\n")
+        f.write("  - premature_boolean=YES means STL does NOT collapse to the new Boolean truth at t_bool.\n")
+        f.write("  - timing table reports when STL eventually collapses (t_stl) and delta=t_stl - t_bool.\n")
+        f.write("  - if STL never collapses to that Boolean truth, t_stl is blank and the event is still premature.\n")
+    digests[os.path.basename(summary_path)] = written_sha256(f)
+
+    # Manifest: generated files only
+    write_manifest(out_dir, SAD_REPORT_FILES, digests)
+    return list(SAD_REPORT_FILES)
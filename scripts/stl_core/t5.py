@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+#
+# T5 state classifier over in-memory sequences.
+#
+# States: Z0, Eplus, S, Eminus, Zstar; phi_T(S) = TRUE, phi_T(Zstar) = FALSE,
+# every other state is UNDEFINED. d is clamped to [0, 1]; s is the W-sample
+# stability gate and r the eps-thresholded sign of delta_d.
+
+import csv
+import hashlib
+
+from stl_core.manifest import open_hashed, written_sha256
+
+T5_Z0 = "Z0"
+T5_EPLUS = "Eplus"
+T5_S = "S"
+T5_EMINUS = "Eminus"
+T5_ZSTAR = "Zstar"
+
+T5_ALL = [T5_Z0, T5_EPLUS, T5_S, T5_EMINUS, T5_ZSTAR]
+PHI_ALL = ["TRUE", "FALSE", "UNDEFINED"]
+
+CHECKPOINT_MAGIC = "STL_T5_CHECKPOINT v1"
+
+def phi_T(state: str) -> str:
+    if state == T5_S:
+        return "TRUE"
+    if state == T5_ZSTAR:
+        return "FALSE"
+    return "UNDEFINED"
+
+def clamp01(x: float) -> float:
+    if x < 0.0:
+        return 0.0
+    if x > 1.0:
+        return 1.0
+    return x
+
+def compute_r(delta_d: float, eps: float) -> int:
+    if delta_d > eps:
+        return 1
+    if delta_d < -eps:
+        return -1
+    return 0
+
+def in_stable_true(d: float, tau_s: float) -> bool:
+    return d >= tau_s
+
+def in_stable_false(d: float, tau_l: float) -> bool:
+    return d <= tau_l
+
+def in_mid(d: float, tau_l: float, tau_s: float) -> bool:
+    return (d > tau_l) and (d < tau_s)
+
+def stable_window_ok(ds: list, idx: int, W: int, tau_l: float, tau_s: float) -> bool:
+    if W <= 1:
+        return True
+    start = idx - (W - 1)
+    if start < 0:
+        return False
+    d0 = ds[idx]
+    if in_stable_true(d0, tau_s):
+        for j in range(start, idx + 1):
+            if not in_stable_true(ds[j], tau_s):
+                return False
+        return True
+    if in_stable_false(d0, tau_l):
+        for j in range(start, idx + 1):
+            if not in_stable_false(ds[j], tau_l):
+                return False
+        return True
+    return False
+
+class StabilityRunLength:
+    # O(1)-per-sample equivalent of stable_window_ok:
+    # tracks consecutive in-tau_s / in-tau_l run lengths (capped at W).
+    def __init__(self, W: int, tau_l: float, tau_s: float):
+        self.W = W
+        self.tau_l = tau_l
+        self.tau_s = tau_s
+        self.run_true = 0
+        self.run_false = 0
+
+    def push(self, d: float) -> int:
+        W = self.W
+        if in_stable_true(d, self.tau_s):
+            self.run_true = min(self.run_true + 1, W)
+        else:
+            self.run_true = 0
+        if in_stable_false(d, self.tau_l):
+            self.run_false = min(self.run_false + 1, W)
+        else:
+            self.run_false = 0
+        if W <= 1:
+            return 1
+        if self.run_true >= W or self.run_false >= W:
+            return 1
+        return 0
+
+def classify_state(d: float, r: int, s: int, tau_l: float, tau_s: float) -> str:
+    if d >= tau_s and s == 1:
+        return T5_S
+    if d <= tau_l and s == 1:
+        return T5_ZSTAR
+    if in_mid(d, tau_l, tau_s) and r == 1:
+        return T5_EPLUS
+    if in_mid(d, tau_l, tau_s) and r == -1:
+        return T5_EMINUS
+    return T5_Z0
+
+class StreamingT5Classifier:
+    # Online T5 classifier: push one (t, d) sample at a time, constant memory.
+    # Carries only the previous d, the stability run lengths and running counts.
+    def __init__(self, W: int, tau_s: float, tau_l: float, eps: float):
+        self.W = W
+        self.tau_s = tau_s
+        self.tau_l = tau_l
+        self.eps = eps
+        self.gate = StabilityRunLength(W, tau_l, tau_s)
+        self.prev_d = None
+        self.last_t = None
+        self.rows = 0
+        self.counts = {k: 0 for k in T5_ALL}
+        self.collapse_counts = {k: 0 for k in PHI_ALL}
+
+    def push(self, t: float, d: float) -> tuple:
+        d = clamp01(d)
+        if self.prev_d is None:
+            delta_d = 0.0
+        else:
+            delta_d = d - self.prev_d
+        r = compute_r(delta_d, self.eps)
+        s = self.gate.push(d)
+        st = classify_state(d, r, s, self.tau_l, self.tau_s)
+        ph = phi_T(st)
+
+        self.prev_d = d
+        self.last_t = t
+        self.rows += 1
+        self.counts[st] += 1
+        self.collapse_counts[ph] += 1
+        return delta_d, r, s, st, ph
+
+    def extend(self, ts, ds) -> tuple:
+        # Classify a whole sequence; returns the per-row columns
+        # (deltas, rs, ss, states, collapses) for it.
+        deltas = []
+        rs = []
+        ss = []
+        states = []
+        collapses = []
+        for i in range(len(ds)):
+            delta_d, r, s, st, ph = self.push(ts[i], ds[i])
+            deltas.append(delta_d)
+            rs.append(r)
+            ss.append(s)
+            states.append(st)
+            collapses.append(ph)
+        return deltas, rs, ss, states, collapses
+
+    def checkpoint_items(self) -> list:
+        # Floats as float.hex() so restore is exact.
+        items = [
+            ("W", str(self.W)),
+            ("tau_s", self.tau_s.hex()),
+            ("tau_l", self.tau_l.hex()),
+            ("eps", self.eps.hex()),
+            ("prev_d", "none" if self.prev_d is None else self.prev_d.hex()),
+            ("last_t", "none" if self.last_t is None else float(self.last_t).hex()),
+            ("rows", str(self.rows)),
+            ("run_true", str(self.gate.run_true)),
+            ("run_false", str(self.gate.run_false)),
+        ]
+        items += [(f"count_{k}", str(self.counts[k])) for k in T5_ALL]
+        items += [(f"collapse_{k}", str(self.collapse_counts[k])) for k in PHI_ALL]
+        return items
+
+    @classmethod
+    def from_checkpoint_items(cls, kv: dict):
+        def hex_or_none(x: str):
+            return None if x == "none" else float.fromhex(x)
+
+        clf = cls(int(kv["W"]), float.fromhex(kv["tau_s"]), float.fromhex(kv["tau_l"]), float.fromhex(kv["eps"]))
+        clf.prev_d = hex_or_none(kv["prev_d"])
+        clf.last_t = hex_or_none(kv["last_t"])
+        clf.rows = int(kv["rows"])
+        clf.gate.run_true = int(kv["run_true"])
+        clf.gate.run_false = int(kv["run_false"])
+        clf.counts = {k: int(kv[f"count_{k}"]) for k in T5_ALL}
+        clf.collapse_counts = {k: int(kv[f"collapse_{k}"]) for k in PHI_ALL}
+        return clf
+
+    def to_checkpoint(self) -> bytes:
+        return seal_kv(CHECKPOINT_MAGIC, self.checkpoint_items())
+
+    @classmethod
+    def from_checkpoint(cls, data: bytes):
+        return cls.from_checkpoint_items(unseal_kv(data, CHECKPOINT_MAGIC))
+
+def seal_kv(magic: str, items: list) -> bytes:
+    # Deterministic key=value text; the last line is the SHA-256 of everything before it.
+    lines = [magic] + [f"{k}={v}" for k, v in items]
+    body = ("\n".join(lines) + "\n").encode("utf-8")
+    return body + f"sha256={hashlib.sha256(body).hexdigest()}\n".encode("utf-8")
+
+def unseal_kv(data: bytes, magic: str) -> dict:
+    body, sep, tail = data.rstrip(b"\n").rpartition(b"\n")
+    body += sep
+    if not tail.startswith(b"sha256=") or tail[7:].decode("ascii", "replace") != hashlib.sha256(body).hexdigest():
+        raise ValueError("Checkpoint SHA-256 mismatch")
+    lines = body.decode("utf-8").splitlines()
+    if not lines or lines[0] != magic:
+        raise ValueError(f"Unsupported checkpoint format (expected {magic})")
+    return dict(x.split("=", 1) for x in lines[1:])
+
+def validate_params(W: int, tau_s: float, tau_l: float, eps: float):
+    if W < 1:
+        return "W must be >= 1"
+    if not (0.0 <= tau_l < tau_s <= 1.0):
+        return "require 0 <= tau_l < tau_s <= 1"
+    if eps < 0.0:
+        return "eps must be >= 0"
+    return None
+
+def classify(ts, ds, W: int, tau_s: float, tau_l: float, eps: float) -> tuple:
+    # One-shot classification of in-memory t/d sequences (d is clamped to [0, 1]).
+    err = validate_params(W, tau_s, tau_l, eps)
+    if err:
+        raise ValueError(err)
+    if len(ts) != len(ds):
+        raise ValueError(f"t/d length mismatch: t={len(ts)} d={len(ds)}")
+    return StreamingT5Classifier(W, tau_s, tau_l, eps).extend(ts, ds)
+
+TRACE_HEADER = ["t", "d", "delta_d", "r", "s", "state", "phi_T"]
+
+def format_trace_row(t: float, d: float, delta_d: float, r: int, s: int, st: str, ph: str) -> list:
+    return [
+        f"{t:.6f}",
+        f"{d:.6f}",
+        f"{delta_d:.6f}",
+        str(r),
+        str(s),
+        st,
+        ph,
+    ]
+
+def write_trace_csv(path: str, ts: list, ds: list, deltas: list, rs: list, ss: list, states: list, collapses: list) -> str:
+    # Returns the SHA-256 of the written file.
+    with open_hashed(path, newline="") as f:
+        w = csv.writer(f)
+        w.writerow(TRACE_HEADER)
+        for i in range(len(ds)):
+            w.writerow(format_trace_row(ts[i], ds[i], deltas[i], rs[i], ss[i], states[i], collapses[i]))
+    return written_sha256(f)
+
+def count_states(states: list, collapses: list) -> tuple[dict, dict]:
+    counts = {k: 0 for k in T5_ALL}
+    for st in states:
+        counts[st] += 1
+    collapse_counts = {k: 0 for k in PHI_ALL}
+    for ph in collapses:
+        collapse_counts[ph] += 1
+    return counts, collapse_counts
+
+def write_summary(path: str, args, rows: int, counts: dict, collapse_counts: dict) -> str:
+    # Returns the SHA-256 of the written file.
+    with open_hashed(path, newline="\n") as f:
+        f.write("STL T5 CLASSIFIER SUMMARY\n")
+        f.write(f"in_csv = {args.in_csv}\n")
+        f.write(f"W = {args.W}\n")
+        f.write(f"tau_s = {args.tau_s}\n")
+        f.write(f"tau_l = {args.tau_l}\n")
+        f.write(f"eps = {args.eps}\n")
+        f.write(f"rows = {rows}\n")
+        f.write("counts:\n")
+        for k in T5_ALL:
+            f.write(f"  {k} = {counts[k]}\n")
+        f.write("collapse_counts:\n")
+        for k in PHI_ALL:
+            f.write(f"  {k} = {collapse_counts[k]}\n")
+    return written_sha256(f)
+
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Shared bulk CSV ingestion for the STL classifier and SAD readers.
+# Standard library only.
+#
+# Column positions are resolved once from the header; rows are parsed in
+# large blocks into typed columns (array('d') for numbers, array('b') for
+# phi_T codes). Errors keep the csv.DictReader-era line numbering
+# (header = line 1, blank lines skipped).
+
+import csv
+import io
+import itertools
+from array import array
+
+BLOCK_BYTES = 4 * 1024 * 1024
+
+# phi_T codes: 1 = TRUE, 0 = FALSE, -1 = UNDEFINED / missing / anything else
+PHI_CODES = {"TRUE": 1, "FALSE": 0}
+
+def read_csv_header(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        header = next(csv.reader(f), None)
+    if header is None:
+        raise ValueError("CSV has no header row.")
+    return header
+
+def _positions(header: list, names: list) -> list:
+    stripped = [x.strip() for x in header]
+    missing = [n for n in names if n not in stripped]
+    if missing:
+        raise ValueError(f"CSV missing required columns: {sorted(missing)}. Required: {','.join(names)}")
+    # csv.DictReader keeps the last duplicate column
+    return [len(stripped) - 1 - stripped[::-1].index(n) for n in names]
+
+def _phi_code(x: str) -> int:
+    return PHI_CODES.get(x.strip().upper(), -1)
+
+def _slow_block(rows: list, pos: list, kinds: list, names: list, empty_label, first_line_no: int) -> list:
+    # Row-by-row parse of a block that failed the fast path; raises with line numbers.
+    cols = [array("d") if k == "f" else array("b") for k in kinds]
+    line_no = first_line_no
+    for row in rows:
+        vals = [row[p].strip() if p < len(row) else "" for p in pos]
+        for v, k, n in zip(vals, kinds, names):
+            if k == "f" and v == "":
+                raise ValueError(f"Empty {empty_label or n} on line {line_no}")
+        for col, v, k, n in zip(cols, vals, kinds, names):
+            if k == "f":
+                try:
+                    col.append(float(v))
+                except ValueError:
+                    raise ValueError(f"Invalid float for {n} on line {line_no}: {v}")
+            else:
+                col.append(_phi_code(v))
+        line_no += 1
+    return cols
+
+def _rows_to_columns(rows: list, pos: list, kinds: list, names: list, empty_label, line_no: int) -> list:
+    try:
+        if any(len(r) <= max(pos) for r in rows):
+            raise ValueError
+        cols = []
+        for p, k in zip(pos, kinds):
+            if k == "f":
+                cols.append(array("d", map(float, [r[p] for r in rows])))
+            else:
+                cols.append(array("b", [_phi_code(r[p]) for r in rows]))
+        return cols
+    except ValueError:
+        return _slow_block(rows, pos, kinds, names, empty_label, line_no)
+
+def _lines_to_columns(text: str, pos: list, kinds: list, names: list, ncols: int, empty_label,
+                      line_no: int) -> tuple:
+    # One block of complete, quote-free lines -> (typed columns, rows parsed);
+    # (None, 0) when the block holds only blank lines.
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    if "" not in lines and set(map(str.count, lines, itertools.repeat(","))) == {ncols - 1}:
+        flat = ",".join(lines).split(",") if ncols > 1 else lines
+        try:
+            cols = []
+            for p, k in zip(pos, kinds):
+                if k == "f":
+                    cols.append(array("d", map(float, flat[p::ncols])))
+                else:
+                    cols.append(array("b", [_phi_code(x) for x in flat[p::ncols]]))
+        except ValueError:
+            cols = _slow_block([x.split(",") for x in lines], pos, kinds, names, empty_label, line_no)
+        return cols, len(lines)
+    rows = [x.split(",") for x in lines if x != ""]
+    if not rows:
+        return None, 0
+    return _rows_to_columns(rows, pos, kinds, names, empty_label, line_no), len(rows)
+
+def iter_csv_column_blocks(path: str, float_cols: list, phi_cols: list = (), empty_label: str = None,
+                           block_bytes: int = BLOCK_BYTES):
+    # Yields one list of typed columns per block, in float_cols + phi_cols order.
+    #
+    # Fast path: a block of plain rows (no quotes, every row exactly as wide as
+    # the header) is split once into a flat field list and the columns are
+    # strided slices of it. Anything else falls back to per-row splitting, and
+    # once a quote is seen the rest of the file goes through csv.reader.
+    names = list(float_cols) + list(phi_cols)
+    kinds = ["f"] * len(float_cols) + ["p"] * len(phi_cols)
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline()
+        if first == "":
+            raise ValueError("CSV has no header row.")
+        header = next(csv.reader([first]))
+        pos = _positions(header, names)
+        ncols = len(header)
+        line_no = 2
+        pending = ""
+        while True:
+            chunk = f.read(block_bytes)
+            text = pending + chunk
+            pending = ""
+            if chunk:
+                cut = text.rfind("\n") + 1
+                if cut == 0:
+                    pending = text
+                    continue
+                text, pending = text[:cut], text[cut:]
+            if not text:
+                break
+            if '"' in text:
+                head = text + pending + (f.readline() if pending else "")
+                reader = csv.reader(itertools.chain(io.StringIO(head), f))
+                while True:
+                    rows = [r for r in itertools.islice(reader, 65536) if r]
+                    if not rows:
+                        return
+                    yield _rows_to_columns(rows, pos, kinds, names, empty_label, line_no)
+                    line_no += len(rows)
+            cols, n = _lines_to_columns(text, pos, kinds, names, ncols, empty_label, line_no)
+            if cols is None:
+                continue
+            line_no += n
+            yield cols
+            if not chunk:
+                break
+
+def iter_csv_column_blocks_from(path: str, float_cols: list, phi_cols: list = (), empty_label: str = None,
+                                offset: int = 0, line_no: int = 2, block_bytes: int = BLOCK_BYTES):
+    # Resumable variant for append-only inputs. Parses the newline-terminated
+    # rows after byte offset (0 = just past the header; line_no is the line
+    # number of the first of them) and yields (columns, end_offset, next_line_no)
+    # per block, so the caller can resume from end_offset later. A trailing row
+    # without its newline is left for the next call. Columns are resolved and
+    # parsed exactly as in iter_csv_column_blocks; a quoted field must not span
+    # a line break.
+    names = list(float_cols) + list(phi_cols)
+    kinds = ["f"] * len(float_cols) + ["p"] * len(phi_cols)
+    with open(path, "rb") as f:
+        first = f.readline()
+        if not first.endswith(b"\n"):
+            raise ValueError("CSV has no header row.")
+        header = next(csv.reader([first.decode("utf-8")]))
+        pos = _positions(header, names)
+        ncols = len(header)
+        offset = max(offset, len(first))
+        f.seek(offset)
+        pending = b""
+        while True:
+            block = f.read(block_bytes)
+            if not block:
+                break
+            pending += block
+            cut = pending.rfind(b"\n") + 1
+            if cut == 0:
+                continue
+            data, pending = pending[:cut], pending[cut:]
+            offset += len(data)
+            text = data.decode("utf-8").replace("\r\n", "\n")
+            if '"' in text:
+                rows = [r for r in csv.reader(io.StringIO(text)) if r]
+                cols = _rows_to_columns(rows, pos, kinds, names, empty_label, line_no) if rows else None
+                n = len(rows)
+            else:
+                cols, n = _lines_to_columns(text, pos, kinds, names, ncols, empty_label, line_no)
+            if cols is None:
+                cols = [array("d") if k == "f" else array("b") for k in kinds]
+            line_no += n
+            yield cols, offset, line_no
+
+def read_csv_columns(path: str, float_cols: list, phi_cols: list = (), empty_label: str = None) -> list:
+    # Whole-file typed columns, in float_cols + phi_cols order.
+    out = [array("d") for _ in float_cols] + [array("b") for _ in phi_cols]
+    for cols in iter_csv_column_blocks(path, float_cols, phi_cols, empty_label):
+        for acc, col in zip(out, cols):
+            acc.extend(col)
+    return out
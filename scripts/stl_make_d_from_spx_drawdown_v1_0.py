@@ -3,24 +3,10 @@
 
 import argparse
 import csv
-import hashlib
 import os
 from datetime import datetime
 
-def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-def write_manifest(out_dir: str, filenames):
-    man_path = os.path.join(out_dir, "MANIFEST.sha256")
-    with open(man_path, "w", encoding="utf-8", newline="\n") as f:
-        for name in filenames:
-            p = os.path.join(out_dir, name)
-            f.write(f"{sha256_file(p)}  {name}\n")
-    return man_path
+from stl_core.manifest import open_hashed, write_manifest, written_sha256
 
 def clamp01(x: float) -> float:
     if x < 0.0:
@@ -83,7 +69,8 @@ def main():
                     window_peak = close[j]
             peaks[i] = window_peak
 
-    with open(out_trace, "w", encoding="utf-8", newline="\n") as f:
+    digests = {}
+    with open_hashed(out_trace, newline="\n") as f:
         w = csv.writer(f)
         w.writerow(["t", "d", "close", "roll_peak", "drawdown"])
         for i in range(len(close)):
@@ -92,8 +79,9 @@ def main():
             dd = 0.0 if H <= 0.0 else (H - C) / H
             d = clamp01(dd / dd_scale)
             w.writerow([i, f"{d:.6f}", f"{C:.6f}", f"{H:.6f}", f"{dd:.6f}"])
+    digests["stl_input_t_d.csv"] = written_sha256(f)
 
-    with open(out_summary, "w", encoding="utf-8", newline="\n") as f:
+    with open_hashed(out_summary, newline="\n") as f:
         f.write("STL SPX Drawdown Adapter Summary\n")
         f.write(f"in_tsv={args.in_tsv}\n")
         f.write(f"rows={len(rows)}\n")
@@ -101,8 +89,9 @@ def main():
         f.write(f"date_max={dates[-1].strftime('%Y-%m-%d')}\n")
         f.write(f"lookback={L}\n")
         f.write(f"dd_scale={dd_scale}\n")
+    digests["summary.txt"] = written_sha256(f)
 
-    write_manifest(args.out_dir, ["stl_input_t_d.csv", "summary.txt"])
+    write_manifest(args.out_dir, ["stl_input_t_d.csv", "summary.txt"], digests)
     print("WROTE:", out_trace)
     print("WROTE:", out_summary)
     print("WROTE:", os.path.join(args.out_dir, "MANIFEST.sha256"))
@@ -13,24 +13,8 @@
 import argparse
 import csv
 import os
-import hashlib
 
-def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-def write_manifest(out_dir: str, files: list[str]) -> None:
-    manifest_path = os.path.join(out_dir, "MANIFEST.sha256")
-    rows = []
-    for rel in sorted(files):
-        abspath = os.path.join(out_dir, rel)
-        rows.append((sha256_file(abspath), rel.replace("\\", "/")))
-    with open(manifest_path, "w", encoding="utf-8", newline="\n") as f:
-        for digest, rel in rows:
-            f.write(f"{digest}  {rel}\n")
+from stl_core.manifest import open_hashed, write_manifest, written_sha256
 
 def main():
     ap = argparse.ArgumentParser()
@@ -64,21 +48,24 @@ def main():
     seq += [0.0] * 20
 
     out_csv = os.path.join(out_dir, "negctl_debounced_trace_v1_0.csv")
-    with open(out_csv, "w", encoding="utf-8", newline="") as f:
+    digests = {}
+    with open_hashed(out_csv, newline="") as f:
         w = csv.writer(f)
         w.writerow(["t", "d"])
         for i, d in enumerate(seq):
             t = i * dt
             w.writerow([t, f"{d:.6f}"])
+    digests["negctl_debounced_trace_v1_0.csv"] = written_sha256(f)
 
     summary_path = os.path.join(out_dir, "summary.txt")
-    with open(summary_path, "w", encoding="utf-8", newline="\n") as f:
+    with open_hashed(summary_path, newline="\n") as f:
         f.write("Negative Control Trace (Debounced Boolean Alignment)\n")
         f.write("Deterministic dominance trace for STL negative control.\n")
         f.write(f"rows={len(seq)} dt={dt}\n")
         f.write("shape=stable_low -> ramp_up -> stable_high -> ramp_down -> stable_low\n")
+    digests["summary.txt"] = written_sha256(f)
 
-    write_manifest(out_dir, ["negctl_debounced_trace_v1_0.csv", "summary.txt"])
+    write_manifest(out_dir, ["negctl_debounced_trace_v1_0.csv", "summary.txt"], digests)
     print("OK: negative control trace created")
     print(f"Output folder: {out_dir}")
 
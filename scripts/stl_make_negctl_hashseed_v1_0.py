@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# Negative control for the replay harness (stl_master_verify.py --verify_replay):
+# Writes the same token set in str-hash iteration order, so the output bytes
+# depend on PYTHONHASHSEED.
+#
+# Purpose: replays run under different seeds must produce different
+# fingerprints here, so VERIFY_REPLAY has to FAIL on this case.
+
+import argparse
+import os
+
+from stl_core.manifest import open_hashed, write_manifest, written_sha256
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out_dir", required=True)
+    ap.add_argument("--n", type=int, default=64)
+    args = ap.parse_args()
+
+    out_dir = args.out_dir
+    os.makedirs(out_dir, exist_ok=True)
+
+    tokens = {f"token_{k:04d}" for k in range(args.n)}
+
+    out_csv = os.path.join(out_dir, "negctl_hashseed_v1_0.csv")
+    digests = {}
+    with open_hashed(out_csv, newline="\n") as f:
+        f.write("i,token\n")
+        for i, tok in enumerate(tokens):
+            f.write(f"{i},{tok}\n")
+    digests["negctl_hashseed_v1_0.csv"] = written_sha256(f)
+
+    summary_path = os.path.join(out_dir, "summary.txt")
+    with open_hashed(summary_path, newline="\n") as f:
+        f.write("Negative Control (PYTHONHASHSEED-dependent order)\n")
+        f.write(f"rows={len(tokens)}\n")
+    digests["summary.txt"] = written_sha256(f)
+
+    write_manifest(out_dir, ["negctl_hashseed_v1_0.csv", "summary.txt"], digests)
+    print("OK: hash-seed negative control created")
+    print(f"Output folder: {out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,29 @@
 import argparse
+import ast
+import concurrent.futures
+import contextlib
 import hashlib
+import importlib.util
+import io
+import itertools
+import json
+import mmap
 import os
+import re
 import shutil
+import string
 import subprocess
 import sys
+import tempfile
+import time
+import traceback
 from pathlib import Path
 
+try:
+    import resource
+except ImportError:  # Windows: no rusage, peak RSS is reported as null
+    resource = None
+
 EXIT_OK = 0
 EXIT_FAIL = 1
 EXIT_ARGS = 2
@@ -15,6 +33,9 @@ EXIT_INVARIANT = 4
 CORE_CASES = ["NEGCTL_SWEEP", "OPERATOR_PRESERVATION"]
 FULL_CASES = ["NEGCTL_SWEEP", "OPERATOR_PRESERVATION", "SPX_DRAWDOWN_CORE"]
 
+# --run_id values; replay i of --replays K runs as REPLAY_<id> with PYTHONHASHSEED=i
+REPLAY_IDS = [chr(ord("A") + i) for i in range(26)]
+
 LOCKED_PARAMS = {
     "W": "20",
     "tau_s": "0.90",
@@ -31,12 +52,57 @@ SCRIPT_OP_PRES = Path("scripts") / "stl_operator_preservation_v1_3.py"
 SCRIPT_SPX_ADAPTER = Path("scripts") / "stl_make_d_from_spx_drawdown_v1_0.py"
 
 
+# Content hashes known to this process: absolute path -> ((size, mtime_ns, inode), sha256).
+# Case, replay and compare passes reuse them instead of re-reading the bytes; a
+# stat mismatch means the file changed and is hashed again. Stage manifests
+# (hashed while the stage wrote its files) are adopted as-is, and files this
+# script rewrites are dropped explicitly.
+_HASH_CACHE = {}
+
+# --hash_jobs / --hash_mmap: threads and read mode for manifest hashing.
+HASH_JOBS = 1
+HASH_MMAP = False
+
+
+def _stat_sig(p: Path):
+    st = p.stat()
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
 def sha256_file(p: Path) -> str:
+    path = str(p.absolute())
+    sig = _stat_sig(p)
+    hit = _HASH_CACHE.get(path)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
     h = hashlib.sha256()
     with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if HASH_MMAP and sig[0] > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        else:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    digest = h.hexdigest()
+    _HASH_CACHE[path] = (sig, digest)
+    return digest
+
+
+def forget_hash(p: Path) -> None:
+    _HASH_CACHE.pop(str(p.absolute()), None)
+
+
+def adopt_manifest(dir_path: Path, manifest_name: str = "MANIFEST.sha256") -> None:
+    # Take the digests a stage wrote for its own files instead of re-reading them.
+    for rel, digest in read_manifest(dir_path / manifest_name).items():
+        p = dir_path / rel
+        if p.is_file():
+            _HASH_CACHE[str(p.absolute())] = (_stat_sig(p), digest)
+
+
+def hash_cache_under(dir_path: Path) -> dict:
+    prefix = str(dir_path.absolute()) + os.sep
+    return {k: v for k, v in _HASH_CACHE.items() if k.startswith(prefix)}
 
 
 def relpath_posix(p: Path, base: Path) -> str:
@@ -50,70 +116,428 @@ def write_manifest(dir_path: Path, manifest_name: str = "MANIFEST.sha256") -> No
             files.append(p)
 
     files.sort(key=lambda x: relpath_posix(x, dir_path))
-    lines = [f"{sha256_file(p)}  {relpath_posix(p, dir_path)}" for p in files]
+    if HASH_JOBS > 1 and len(files) > 1:
+        # hashlib releases the GIL on large updates; map keeps the sorted order.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(HASH_JOBS, len(files))) as ex:
+            digests = list(ex.map(sha256_file, files))
+    else:
+        digests = [sha256_file(p) for p in files]
+    lines = [f"{d}  {relpath_posix(p, dir_path)}" for d, p in zip(digests, files)]
 
     out = dir_path / manifest_name
+    forget_hash(out)
     out.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8", newline="\n")
 
 
 def ensure_clean_dir(p: Path) -> None:
     if p.exists():
         shutil.rmtree(p)
+        for k in hash_cache_under(p):
+            del _HASH_CACHE[k]
+        prefix = str(p.absolute()) + os.sep
+        for k in [k for k in _ROW_COUNTS if k.startswith(prefix)]:
+            del _ROW_COUNTS[k]
     p.mkdir(parents=True, exist_ok=True)
 
 
+# rusage of the last stage subprocess reaped by run_py (None where os.wait4 is missing).
+_LAST_CHILD_RUSAGE = None
+
+
 def run_py(args_list, env):
-    cp = subprocess.run(
-        [sys.executable] + args_list,
-        env=env,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-    if cp.returncode != 0:
-        sys.stdout.write(cp.stdout)
-        sys.stderr.write(cp.stderr)
+    global _LAST_CHILD_RUSAGE
+    if hasattr(os, "wait4"):
+        # Reap the child with wait4 to get its own CPU time and peak RSS; output
+        # goes through temp files so nothing can block on a full pipe meanwhile.
+        with tempfile.TemporaryFile() as out_f, tempfile.TemporaryFile() as err_f:
+            p = subprocess.Popen([sys.executable] + args_list, env=env, stdout=out_f, stderr=err_f)
+            _, status, _LAST_CHILD_RUSAGE = os.wait4(p.pid, 0)
+            p.returncode = os.waitstatus_to_exitcode(status)
+            out_f.seek(0)
+            err_f.seek(0)
+            stdout = io.TextIOWrapper(out_f).read()
+            stderr = io.TextIOWrapper(err_f).read()
+        returncode = p.returncode
+    else:
+        cp = subprocess.run(
+            [sys.executable] + args_list,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        stdout, stderr, returncode = cp.stdout, cp.stderr, cp.returncode
+    if returncode != 0:
+        sys.stdout.write(stdout)
+        sys.stderr.write(stderr)
         raise RuntimeError(f"subprocess failed: {args_list}")
-    return cp.stdout
+    return stdout
+
+
+_STAGE_MODULES = {}
+
+
+def load_stage(script: Path):
+    # Stage scripts are loaded once per process; their siblings (stl_core, ...)
+    # import from the script directory, as they do under "python scripts/x.py".
+    key = str(script.resolve())
+    mod = _STAGE_MODULES.get(key)
+    if mod is None:
+        script_dir = str(Path(key).parent)
+        if script_dir not in sys.path:
+            sys.path.insert(0, script_dir)
+        spec = importlib.util.spec_from_file_location("stl_stage_" + script.stem, key)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        _STAGE_MODULES[key] = mod
+    return mod
+
+
+def run_in_process(args_list, env):
+    # Same contract as run_py, but calls the stage's main() directly.
+    # argv, os.environ, cwd and stdout/stderr are swapped in for the stage and
+    # restored afterwards. PYTHONHASHSEED cannot change inside a running
+    # interpreter, so main() restarts under the stage seed when it differs.
+    script = Path(args_list[0])
+    mod = load_stage(script)
+
+    saved_argv = sys.argv
+    saved_env = os.environ.copy()
+    saved_cwd = os.getcwd()
+    out = io.StringIO()
+    err = io.StringIO()
+    try:
+        sys.argv = [str(script)] + [str(x) for x in args_list[1:]]
+        os.environ.clear()
+        os.environ.update(env)
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                code = mod.main() or 0
+            except SystemExit as e:
+                code = e.code
+                if code is not None and not isinstance(code, int):
+                    err.write(f"{code}\n")
+                    code = 1
+                code = code or 0
+            except Exception:
+                traceback.print_exc()
+                code = 1
+    finally:
+        sys.argv = saved_argv
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+
+    if code != 0:
+        sys.stdout.write(out.getvalue())
+        sys.stderr.write(err.getvalue())
+        raise RuntimeError(f"in-process stage failed: {args_list}")
+    return out.getvalue()
+
+
+# Environment entries that reach the stages (build_env) and so belong in the stage key.
+STAGE_CACHE_ENV = ("PYTHONHASHSEED", "LC_ALL", "LANG", "TZ")
+
+
+def stage_sources(script: Path) -> list:
+    # The stage script plus every sibling module or package it imports, transitively.
+    base = script.resolve().parent
+    seen = []
+    todo = [script.resolve()]
+    while todo:
+        p = todo.pop()
+        if p in seen:
+            continue
+        seen.append(p)
+        for node in ast.walk(ast.parse(p.read_bytes())):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                top = name.split(".")[0]
+                if (base / (top + ".py")).is_file():
+                    todo.append(base / (top + ".py"))
+                elif (base / top / "__init__.py").is_file():
+                    todo.extend(sorted((base / top).rglob("*.py")))
+    return sorted(seen)
+
+
+def stage_key(args_list, env) -> str:
+    # SHA-256 over the stage sources, the argument vector (which carries
+    # LOCKED_PARAMS), the contents of every file argument and the stage env.
+    h = hashlib.sha256()
 
+    def put(*parts):
+        for x in parts:
+            h.update(str(x).encode("utf-8"))
+            h.update(b"\0")
+
+    put("STL_STAGE_CACHE v1", sys.version)
+    script = Path(args_list[0])
+    base = script.resolve().parent
+    for src in stage_sources(script):
+        put(src.relative_to(base).as_posix(), sha256_file(src))
+    for k in STAGE_CACHE_ENV:
+        put(k, env.get(k, ""))
+    for a in args_list:
+        p = Path(a)
+        put(a, sha256_file(p) if p.is_file() else "")
+    return h.hexdigest()
 
-def compare_dirs(a: Path, b: Path) -> bool:
-    a_files = sorted([p for p in a.rglob("*") if p.is_file()], key=lambda x: relpath_posix(x, a))
-    b_files = sorted([p for p in b.rglob("*") if p.is_file()], key=lambda x: relpath_posix(x, b))
 
-    if [relpath_posix(p, a) for p in a_files] != [relpath_posix(p, b) for p in b_files]:
+def store_stage(entry: Path, out_dir: Path, stdout: str) -> None:
+    # entry/OUT is a copy of the stage's --out_dir, entry/FINGERPRINT the
+    # SHA-256 of its MANIFEST.sha256. Built under a temp name and renamed, so
+    # concurrent --jobs workers never see a partial entry.
+    manifest = out_dir / "MANIFEST.sha256"
+    if not manifest.is_file():
+        return
+    tmp = entry.parent / f"{entry.name}.tmp{os.getpid()}"
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    shutil.copytree(out_dir, tmp / "OUT")
+    (tmp / "stdout.txt").write_text(stdout, encoding="utf-8", newline="\n")
+    (tmp / "FINGERPRINT").write_text(sha256_file(manifest) + "\n", encoding="utf-8", newline="\n")
+    if entry.exists():
+        shutil.rmtree(entry)
+    try:
+        os.replace(tmp, entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def restore_stage(entry: Path, out_dir: Path) -> bool:
+    # Materialize entry/OUT into out_dir and check it against the stored
+    # fingerprint and manifest. On any mismatch out_dir is emptied again.
+    src = entry / "OUT"
+    manifest = src / "MANIFEST.sha256"
+    fingerprint = entry / "FINGERPRINT"
+    if not manifest.is_file() or not fingerprint.is_file():
         return False
-
-    for ap in a_files:
-        rp = relpath_posix(ap, a)
-        bp = b / rp
-        if ap.stat().st_size != bp.stat().st_size:
-            return False
-        if sha256_file(ap) != sha256_file(bp):
+    if sha256_file(manifest) != fingerprint.read_text(encoding="utf-8").strip():
+        return False
+    shutil.copytree(src, out_dir, dirs_exist_ok=True)
+    for rel, digest in read_manifest(out_dir / "MANIFEST.sha256").items():
+        p = out_dir / rel
+        if not p.is_file() or sha256_file(p) != digest:
+            ensure_clean_dir(out_dir)
             return False
-
     return True
 
 
+class StageCache:
+    # --stage_cache: same contract as run_py/run_in_process. A stage whose key
+    # is already in the cache has its --out_dir materialized from the cache
+    # instead of being run; otherwise it runs and its output is stored.
+    def __init__(self, root: Path, run=run_py):
+        self.root = root
+        self.run = run
+
+    def __call__(self, args_list, env):
+        out_dir = Path(args_list[args_list.index("--out_dir") + 1])
+        entry = self.root / stage_key(args_list, env)
+        if entry.is_dir() and restore_stage(entry, out_dir):
+            sys.stderr.write(f"STAGE_CACHE: hit {args_list[0]}\n")
+            return (entry / "stdout.txt").read_text(encoding="utf-8")
+        stdout = self.run(args_list, env)
+        self.root.mkdir(parents=True, exist_ok=True)
+        store_stage(entry, out_dir, stdout)
+        return stdout
+
+
+# Per-stage perf records of this process (see PerfRun); --jobs workers hand theirs back.
+_PERF_RECORDS = []
+
+PERF_METRICS = ("wall_s", "cpu_s", "peak_rss_kib")
+# Time regressions smaller than this are treated as noise by --perf_compare.
+PERF_MIN_SECONDS = 0.05
+
+
+def rss_kib(ru_maxrss: int) -> int:
+    return ru_maxrss // 1024 if sys.platform == "darwin" else ru_maxrss
+
+
+class PerfRun:
+    # Same contract as run_py/run_in_process/StageCache; records wall time, CPU
+    # time, peak RSS, input rows, output bytes and rows/s for every stage. For a
+    # stage subprocess CPU and peak RSS are the child's own (wait4); in-process
+    # stages report this process's CPU delta and its RSS high-water mark.
+    # Input rows come from count_csv_rows, which counts each file once and is
+    # shared with normalize_classifier_summary (classifier inputs and traces
+    # are counted there anyway).
+    def __init__(self, root: Path, run=run_py):
+        self.root = root
+        self.run = run
+
+    def __call__(self, args_list, env):
+        global _LAST_CHILD_RUSAGE
+        out_dir = Path(args_list[args_list.index("--out_dir") + 1])
+        inputs = [Path(a) for a in args_list[1:] if Path(a).suffix in (".csv", ".tsv") and Path(a).is_file()]
+        rows = sum(count_csv_rows(p) for p in inputs)
+
+        _LAST_CHILD_RUSAGE = None
+        t0 = time.perf_counter()
+        c0 = time.process_time()
+        stdout = self.run(args_list, env)
+        wall = time.perf_counter() - t0
+        cpu = time.process_time() - c0
+
+        ru = _LAST_CHILD_RUSAGE
+        if ru is not None:
+            cpu += ru.ru_utime + ru.ru_stime
+            rss = rss_kib(ru.ru_maxrss)
+        elif resource is not None:
+            rss = rss_kib(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        else:
+            rss = None
+
+        _PERF_RECORDS.append({
+            "stage": out_dir.resolve().relative_to(self.root.resolve()).as_posix(),
+            "script": Path(args_list[0]).name,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_rss_kib": rss,
+            "input_rows": rows,
+            "output_bytes": sum(p.stat().st_size for p in out_dir.rglob("*") if p.is_file()),
+            "rows_per_s": round(rows / wall, 3) if wall > 0 else 0.0,
+        })
+        return stdout
+
+
+def write_perf(path: Path, args, total_wall: float) -> dict:
+    perf = {
+        "caseset": args.cases,
+        "run_id": args.run_id,
+        "jobs": args.jobs,
+        "in_process": args.in_process,
+        "python": sys.version.split()[0],
+        "total_wall_s": round(total_wall, 6),
+        "stages": sorted(_PERF_RECORDS, key=lambda r: r["stage"]),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(perf, indent=2, sort_keys=True) + "\n", encoding="utf-8", newline="\n")
+    return perf
+
+
+def perf_regressions(current: dict, baseline: dict, threshold: float) -> list:
+    # Stages present in both runs whose wall/CPU time or peak RSS grew by more
+    # than threshold (a fraction), plus the total wall time.
+    base = {r["stage"]: r for r in baseline.get("stages", [])}
+    pairs = [("TOTAL", "wall_s", current.get("total_wall_s"), baseline.get("total_wall_s"))]
+    for r in current["stages"]:
+        b = base.get(r["stage"])
+        if b is not None:
+            pairs += [(r["stage"], m, r.get(m), b.get(m)) for m in PERF_METRICS]
+
+    out = []
+    for stage, metric, cur, old in pairs:
+        if cur is None or old is None:
+            continue
+        slack = 0 if metric == "peak_rss_kib" else PERF_MIN_SECONDS
+        if cur > old * (1.0 + threshold) + slack:
+            growth = f"+{(cur / old - 1.0) * 100.0:.1f}%" if old else "new"
+            out.append(f"{stage} {metric}: {old} -> {cur} ({growth})")
+    return out
+
+
+def read_manifest(path: Path) -> dict:
+    out = {}
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            digest, _, rel = line.partition("  ")
+            out[rel] = digest
+    return out
+
+
+def manifest_diff(a: Path, b: Path) -> list:
+    # Sorted rel paths whose top-level MANIFEST.sha256 digests differ or that
+    # exist on one side only. The top-level manifest lists every file of the
+    # tree (nested manifests excluded), so no file is read here.
+    ma = read_manifest(a / "MANIFEST.sha256")
+    mb = read_manifest(b / "MANIFEST.sha256")
+    return sorted(rel for rel in set(ma) | set(mb) if ma.get(rel) != mb.get(rel))
+
+
+def first_byte_diff(pa: Path, pb: Path):
+    # Offset of the first differing byte (or the shorter length), None if equal.
+    offset = 0
+    with pa.open("rb") as fa, pb.open("rb") as fb:
+        while True:
+            ca = fa.read(1024 * 1024)
+            cb = fb.read(1024 * 1024)
+            if ca != cb:
+                n = min(len(ca), len(cb))
+                i = next((k for k in range(n) if ca[k] != cb[k]), n)
+                return offset + i
+            if not ca:
+                return None
+            offset += len(ca)
+
+
+def first_row_diff(pa: Path, pb: Path):
+    # (1-based line number incl. header, row_a, row_b) of the first differing CSV row.
+    with pa.open("r", encoding="utf-8", newline="") as fa, pb.open("r", encoding="utf-8", newline="") as fb:
+        for n, (ra, rb) in enumerate(itertools.zip_longest(fa, fb), start=1):
+            if ra != rb:
+                return n, (ra or "").rstrip("\r\n"), (rb or "").rstrip("\r\n")
+    return None
+
+
+def first_divergence(a: Path, b: Path, diff: list) -> list:
+    # Report lines for the first differing artifact.
+    if not diff:
+        return []
+    rel = diff[0]
+    pa = a / rel
+    pb = b / rel
+    if not pa.exists() or not pb.exists():
+        return [f"first divergence: {rel} (only in {a.name if pa.exists() else b.name})"]
+    lines = [f"first divergence: {rel} at byte {first_byte_diff(pa, pb)}"]
+    if pa.suffix == ".csv":
+        row = first_row_diff(pa, pb)
+        if row is not None:
+            n, ra, rb = row
+            lines.append(f"  line {n} {a.name}: {ra}")
+            lines.append(f"  line {n} {b.name}: {rb}")
+            if ra == rb:
+                lines.append("  (line endings differ)")
+    return lines
+
+
 def require_file(p: Path):
     if not p.exists():
         raise FileNotFoundError(str(p))
 
 
 def summary_write(p: Path, lines):
+    forget_hash(p)
     p.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8", newline="\n")
 
 
-def build_env():
+def build_env(stage_hashseed: int = 0):
+    # The stage seed is never inherited from the caller's environment; only
+    # --stage_hashseed (set per replay by run_replays) changes it.
     env = os.environ.copy()
-    env["PYTHONHASHSEED"] = "0"
+    env["PYTHONHASHSEED"] = str(stage_hashseed)
     env["LC_ALL"] = "C"
     env["LANG"] = "C"
     env["TZ"] = "UTC"
     return env
 
 
+# Data row counts known to this process: absolute path -> ((size, mtime_ns, inode), rows).
+_ROW_COUNTS = {}
+
+
 def count_csv_rows(csv_path: Path) -> int:
+    path = str(csv_path.absolute())
+    sig = _stat_sig(csv_path)
+    hit = _ROW_COUNTS.get(path)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
     n = 0
     with csv_path.open("r", encoding="utf-8", newline="") as f:
         first = True
@@ -123,10 +547,11 @@ def count_csv_rows(csv_path: Path) -> int:
                 continue
             if line.strip():
                 n += 1
+    _ROW_COUNTS[path] = (sig, n)
     return n
 
 
-def normalize_classifier_summary(classify_dir: Path, in_csv: Path):
+def normalize_classifier_summary(classify_dir: Path, in_csv: Path, params: dict = LOCKED_PARAMS):
     summary_path = classify_dir / "summary.txt"
     if not summary_path.exists():
         return
@@ -138,10 +563,10 @@ def normalize_classifier_summary(classify_dir: Path, in_csv: Path):
     lines = [
         "STL_T5_CLASSIFIER",
         f"in_csv={in_csv.name}",
-        f"W={LOCKED_PARAMS['W']}",
-        f"tau_s={LOCKED_PARAMS['tau_s']}",
-        f"tau_l={LOCKED_PARAMS['tau_l']}",
-        f"eps={LOCKED_PARAMS['eps']}",
+        f"W={params['W']}",
+        f"tau_s={params['tau_s']}",
+        f"tau_l={params['tau_l']}",
+        f"eps={params['eps']}",
         f"rows_in={rows_in}",
         f"rows_out={rows_out}",
         "OK",
@@ -149,7 +574,7 @@ def normalize_classifier_summary(classify_dir: Path, in_csv: Path):
     summary_write(summary_path, lines)
 
 
-def do_negctl_sweep(out_case_dir: Path, env):
+def do_negctl_sweep(out_case_dir: Path, env, run=run_py):
     require_file(SCRIPT_NEGCTL_TRACE)
     require_file(SCRIPT_CLASSIFIER)
     require_file(SCRIPT_SAD_REPORT)
@@ -159,7 +584,8 @@ def do_negctl_sweep(out_case_dir: Path, env):
     trace_dir = out_case_dir / "TRACE"
     trace_dir.mkdir(parents=True, exist_ok=True)
 
-    run_py([str(SCRIPT_NEGCTL_TRACE), "--out_dir", str(trace_dir)], env)
+    run([str(SCRIPT_NEGCTL_TRACE), "--out_dir", str(trace_dir)], env)
+    adopt_manifest(trace_dir)
 
     trace_csv = trace_dir / "negctl_debounced_trace_v1_0.csv"
     require_file(trace_csv)
@@ -167,7 +593,7 @@ def do_negctl_sweep(out_case_dir: Path, env):
     classify_dir = out_case_dir / "CLASSIFY"
     classify_dir.mkdir(parents=True, exist_ok=True)
 
-    run_py(
+    run(
         [
             str(SCRIPT_CLASSIFIER),
             "--in_csv",
@@ -189,12 +615,13 @@ def do_negctl_sweep(out_case_dir: Path, env):
     trace_out = classify_dir / "stl_trace_out.csv"
     require_file(trace_out)
 
+    adopt_manifest(classify_dir)
     normalize_classifier_summary(classify_dir, trace_csv)
 
     sad_dir = out_case_dir / "SAD"
     sad_dir.mkdir(parents=True, exist_ok=True)
 
-    run_py(
+    run(
         [
             str(SCRIPT_SAD_REPORT),
             "--adapter_csv",
@@ -230,6 +657,7 @@ def do_negctl_sweep(out_case_dir: Path, env):
         ],
         env,
     )
+    adopt_manifest(sad_dir)
 
     summary_write(out_case_dir / "summary.txt", ["CASE: NEGCTL_SWEEP", "OK"])
 
@@ -239,11 +667,12 @@ def do_negctl_sweep(out_case_dir: Path, env):
     write_manifest(out_case_dir)
 
 
-def do_operator_preservation(out_case_dir: Path, env):
+def do_operator_preservation(out_case_dir: Path, env, run=run_py):
     require_file(SCRIPT_OP_PRES)
     ensure_clean_dir(out_case_dir)
 
-    run_py([str(SCRIPT_OP_PRES), "--out_dir", str(out_case_dir)], env)
+    run([str(SCRIPT_OP_PRES), "--out_dir", str(out_case_dir)], env)
+    adopt_manifest(out_case_dir)
 
     if not (out_case_dir / "summary.txt").exists():
         summary_write(out_case_dir / "summary.txt", ["CASE: OPERATOR_PRESERVATION", "OK"])
@@ -251,7 +680,7 @@ def do_operator_preservation(out_case_dir: Path, env):
     write_manifest(out_case_dir)
 
 
-def do_spx_drawdown_core(out_case_dir: Path, env):
+def do_spx_drawdown_core(out_case_dir: Path, env, run=run_py):
     require_file(SCRIPT_SPX_ADAPTER)
     require_file(SCRIPT_CLASSIFIER)
     require_file(SCRIPT_SAD_REPORT)
@@ -262,7 +691,8 @@ def do_spx_drawdown_core(out_case_dir: Path, env):
     adapter_dir = out_case_dir / "ADAPTER"
     adapter_dir.mkdir(parents=True, exist_ok=True)
 
-    run_py([str(SCRIPT_SPX_ADAPTER), "--in_tsv", str(DATA_SPX_CORE), "--out_dir", str(adapter_dir)], env)
+    run([str(SCRIPT_SPX_ADAPTER), "--in_tsv", str(DATA_SPX_CORE), "--out_dir", str(adapter_dir)], env)
+    adopt_manifest(adapter_dir)
 
     adapter_csv = adapter_dir / "stl_input_t_d.csv"
     require_file(adapter_csv)
@@ -270,7 +700,7 @@ def do_spx_drawdown_core(out_case_dir: Path, env):
     classify_dir = out_case_dir / "CLASSIFY"
     classify_dir.mkdir(parents=True, exist_ok=True)
 
-    run_py(
+    run(
         [
             str(SCRIPT_CLASSIFIER),
             "--in_csv",
@@ -292,12 +722,13 @@ def do_spx_drawdown_core(out_case_dir: Path, env):
     trace_csv = classify_dir / "stl_trace_out.csv"
     require_file(trace_csv)
 
+    adopt_manifest(classify_dir)
     normalize_classifier_summary(classify_dir, adapter_csv)
 
     sad_dir = out_case_dir / "SAD"
     sad_dir.mkdir(parents=True, exist_ok=True)
 
-    run_py(
+    run(
         [
             str(SCRIPT_SAD_REPORT),
             "--adapter_csv",
@@ -333,6 +764,7 @@ def do_spx_drawdown_core(out_case_dir: Path, env):
         ],
         env,
     )
+    adopt_manifest(sad_dir)
 
     if not (out_case_dir / "summary.txt").exists():
         summary_write(out_case_dir / "summary.txt", ["CASE: SPX_DRAWDOWN_CORE", "OK"])
@@ -343,32 +775,361 @@ def do_spx_drawdown_core(out_case_dir: Path, env):
     write_manifest(out_case_dir)
 
 
-def run_caseset(caseset: str, replay_dir: Path, env):
-    cases = CORE_CASES if caseset == "core" else FULL_CASES
-
-    for c in cases:
-        out_case_dir = replay_dir / c
-        if c == "NEGCTL_SWEEP":
-            do_negctl_sweep(out_case_dir, env)
-        elif c == "OPERATOR_PRESERVATION":
-            do_operator_preservation(out_case_dir, env)
-        elif c == "SPX_DRAWDOWN_CORE":
-            do_spx_drawdown_core(out_case_dir, env)
-        else:
-            raise RuntimeError("unknown case: " + c)
+def run_case(case: str, out_case_dir: Path, env, run=run_py):
+    if case == "NEGCTL_SWEEP":
+        do_negctl_sweep(out_case_dir, env, run)
+    elif case == "OPERATOR_PRESERVATION":
+        do_operator_preservation(out_case_dir, env, run)
+    elif case == "SPX_DRAWDOWN_CORE":
+        do_spx_drawdown_core(out_case_dir, env, run)
+    else:
+        raise RuntimeError("unknown case: " + case)
+
+
+def worker_results(dir_path: Path) -> tuple:
+    # What a --jobs worker hands back: the content hashes under dir_path (so the
+    # parent's manifests do not hash those files again) and its perf records.
+    records = list(_PERF_RECORDS)
+    _PERF_RECORDS.clear()
+    return hash_cache_under(dir_path), records
+
+
+def run_case_worker(case: str, out_case_dir: Path, env, run=run_py, hash_opts=(1, False)) -> tuple:
+    global HASH_JOBS, HASH_MMAP
+    HASH_JOBS, HASH_MMAP = hash_opts
+    run_case(case, out_case_dir, env, run)
+    return worker_results(out_case_dir)
+
+
+CASE_NAME_RE = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.-]*$")
+SPEC_STAGE_KEYS = {"script", "args", "needs", "inputs", "outputs", "normalize_classifier_summary"}
+# Case dirs sit next to these verifier outputs and stage dirs next to the case
+# MANIFEST.sha256/summary.txt, so spec names may not take them (compared
+# case-insensitively for case-insensitive filesystems).
+SPEC_RESERVED_NAMES = frozenset(n.casefold() for n in (
+    ["MANIFEST.sha256", "summary.txt", "perf.json", "stl_verify_out", "REPLAY_MATRIX.txt"]
+    + [f"REPLAY_{rid}" for rid in REPLAY_IDS]
+    + [f"perf_REPLAY_{rid}.json" for rid in REPLAY_IDS]))
+
+
+def load_case_spec(path: Path) -> dict:
+    # --case_spec: JSON (or TOML on Python 3.11+) describing extra cases as stage graphs:
+    #
+    #   {"cases": {"MY_DATASET": {
+    #       "params": {"threshold": "0.5"},
+    #       "stages": {
+    #           "ADAPTER":  {"script": "scripts/x.py", "args": ["--in_tsv", "data/x.tsv"],
+    #                        "outputs": ["stl_input_t_d.csv"]},
+    #           "CLASSIFY": {"script": "scripts/stl_t5_classifier_v1_0.py", "needs": ["ADAPTER"],
+    #                        "args": ["--in_csv", "{ADAPTER}/stl_input_t_d.csv", "--W", "{W}", ...],
+    #                        "normalize_classifier_summary": true}}}}}
+    #
+    # Every stage runs "script args... --out_dir <case>/<stage>". In args, inputs and
+    # outputs, {NAME} is a LOCKED_PARAMS/params value or the out_dir of a stage in
+    # "needs". params may add values but not override LOCKED_PARAMS. Returns
+    # name -> {"params": dict, "stages": [(stage, spec), ...]} with stages in
+    # dependency order; raises ValueError on a malformed spec.
+    if path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("TOML case specs need Python 3.11+ (tomllib); use JSON")
+        with path.open("rb") as f:
+            data = tomllib.load(f)
+    else:
+        data = json.loads(path.read_text(encoding="utf-8"))
+
+    cases = data.get("cases") if isinstance(data, dict) else None
+    if not isinstance(cases, dict) or not cases:
+        raise ValueError(f"{path}: expected a non-empty 'cases' table")
+
+    out = {}
+    for name, case in cases.items():
+        where = f"{path}: case {name}"
+        if not CASE_NAME_RE.match(name) or name in FULL_CASES:
+            raise ValueError(f"{where}: invalid or built-in case name")
+        if name.casefold() in SPEC_RESERVED_NAMES:
+            raise ValueError(f"{where}: case name {name!r} is reserved for verifier output")
+        if not isinstance(case, dict) or not isinstance(case.get("stages"), dict) or not case["stages"]:
+            raise ValueError(f"{where}: expected a non-empty 'stages' table")
+        extra = case.get("params", {})
+        if not isinstance(extra, dict) or set(extra) & set(LOCKED_PARAMS):
+            raise ValueError(f"{where}: 'params' must be a table and cannot override {sorted(LOCKED_PARAMS)}")
+        params = dict(LOCKED_PARAMS)
+        params.update({k: str(v) for k, v in extra.items()})
+
+        stages = {}
+        for sname, st in case["stages"].items():
+            swhere = f"{where} stage {sname}"
+            if not CASE_NAME_RE.match(sname) or not isinstance(st, dict) or not isinstance(st.get("script"), str):
+                raise ValueError(f"{swhere}: invalid stage name or missing 'script'")
+            if sname.casefold() in SPEC_RESERVED_NAMES:
+                raise ValueError(f"{swhere}: stage name {sname!r} is reserved for verifier output")
+            unknown = set(st) - SPEC_STAGE_KEYS
+            if unknown:
+                raise ValueError(f"{swhere}: unknown keys {sorted(unknown)}")
+            spec = {
+                "script": st["script"],
+                "args": [str(a) for a in st.get("args", [])],
+                "needs": list(st.get("needs", [])),
+                "inputs": [str(a) for a in st.get("inputs", [])],
+                "outputs": [str(a) for a in st.get("outputs", [])],
+                "normalize_classifier_summary": bool(st.get("normalize_classifier_summary", False)),
+            }
+            if "--out_dir" in spec["args"]:
+                raise ValueError(f"{swhere}: --out_dir is set by the scheduler")
+            if spec["normalize_classifier_summary"] and "--in_csv" not in spec["args"]:
+                raise ValueError(f"{swhere}: normalize_classifier_summary needs an --in_csv argument")
+            for dep in spec["needs"]:
+                if dep not in case["stages"] or dep == sname:
+                    raise ValueError(f"{swhere}: unknown dependency {dep}")
+            known = set(params) | set(spec["needs"])
+            for text in spec["args"] + spec["inputs"] + spec["outputs"]:
+                for _, field, _, _ in string.Formatter().parse(text):
+                    if field is not None and field not in known:
+                        raise ValueError(f"{swhere}: unknown placeholder {{{field}}} in {text!r}")
+            stages[sname] = spec
+
+        order = []
+        while len(order) < len(stages):
+            ready = [s for s in stages if s not in order and all(d in order for d in stages[s]["needs"])]
+            if not ready:
+                raise ValueError(f"{where}: dependency cycle among stages")
+            order += ready
+        out[name] = {"params": params, "stages": [(s, stages[s]) for s in order]}
+    return out
+
+
+def run_spec_stage(case_dir: Path, name: str, stage: dict, params: dict, env, run=run_py):
+    stage_dir = case_dir / name
+    stage_dir.mkdir(parents=True, exist_ok=True)
+    values = dict(params)
+    values.update({dep: str(case_dir / dep) for dep in stage["needs"]})
+    args = [a.format_map(values) for a in stage["args"]]
+
+    require_file(Path(stage["script"]))
+    for p in stage["inputs"]:
+        require_file(Path(p.format_map(values)))
+
+    run([stage["script"]] + args + ["--out_dir", str(stage_dir)], env)
+    adopt_manifest(stage_dir)
+
+    for rel in stage["outputs"]:
+        require_file(stage_dir / rel.format_map(values))
+    if stage["normalize_classifier_summary"]:
+        used = dict(params)
+        for k in ("W", "tau_s", "tau_l", "eps"):
+            if "--" + k in args:
+                used[k] = args[args.index("--" + k) + 1]
+        normalize_classifier_summary(stage_dir, Path(args[args.index("--in_csv") + 1]), used)
+
+    write_manifest(stage_dir)
+
+
+def run_spec_stage_worker(case_dir: Path, name: str, stage: dict, params: dict, env, run=run_py,
+                          hash_opts=(1, False)) -> tuple:
+    global HASH_JOBS, HASH_MMAP
+    HASH_JOBS, HASH_MMAP = hash_opts
+    run_spec_stage(case_dir, name, stage, params, env, run)
+    return worker_results(case_dir / name)
+
+
+def run_dag(nodes: list, jobs: int) -> None:
+    # nodes: [(node_id, deps, fn, fn_args)] in dependency order; fn returns
+    # worker_results(). With jobs > 1 every node whose deps have
+    # succeeded runs in a pool of up to `jobs` worker processes; dependents of a
+    # failed node are skipped, everything else still runs, and the first
+    # failure in node order is raised, so the outcome does not depend on scheduling.
+    if jobs <= 1 or len(nodes) <= 1:
+        for _, _, fn, fn_args in nodes:
+            hashes, perf = fn(*fn_args)
+            _HASH_CACHE.update(hashes)
+            _PERF_RECORDS.extend(perf)
+        return
 
-    summary_write(replay_dir / "summary.txt", [f"CASESET: {caseset}", "OK: STL verification complete"])
+    pending = list(nodes)
+    done = set()
+    failed = {}
+    running = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(nodes))) as ex:
+        while pending or running:
+            for node in list(pending):
+                node_id, deps, fn, fn_args = node
+                if any(d in failed for d in deps):
+                    failed[node_id] = None
+                    pending.remove(node)
+                elif all(d in done for d in deps):
+                    running[ex.submit(fn, *fn_args)] = node_id
+                    pending.remove(node)
+            if not running:
+                break
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in finished:
+                node_id = running.pop(fut)
+                try:
+                    hashes, perf = fut.result()
+                    _HASH_CACHE.update(hashes)
+                    _PERF_RECORDS.extend(perf)
+                    done.add(node_id)
+                except Exception as e:
+                    failed[node_id] = e
+
+    for node_id, _, _, _ in nodes:
+        if failed.get(node_id) is not None:
+            raise failed[node_id]
+
+
+def run_caseset(caseset: str, replay_dir: Path, env, run=run_py, jobs: int = 1, spec: dict = None):
+    cases = {"core": CORE_CASES, "full": FULL_CASES}.get(caseset, [])
+    spec = spec or {}
+    hash_opts = (HASH_JOBS, HASH_MMAP)
+
+    # Built-in cases are single nodes; spec cases contribute one node per stage.
+    # Cases share no files, so only stage "needs" order the graph.
+    nodes = [(c, [], run_case_worker, (c, replay_dir / c, env, run, hash_opts)) for c in cases]
+    for name, case in spec.items():
+        case_dir = replay_dir / name
+        ensure_clean_dir(case_dir)
+        for sname, stage in case["stages"]:
+            nodes.append((
+                f"{name}/{sname}",
+                [f"{name}/{d}" for d in stage["needs"]],
+                run_spec_stage_worker,
+                (case_dir, sname, stage, case["params"], env, run, hash_opts),
+            ))
+    run_dag(nodes, jobs)
+
+    for name in spec:
+        summary_write(replay_dir / name / "summary.txt", [f"CASE: {name}", "OK"])
+        write_manifest(replay_dir / name)
+
+    lines = [f"CASESET: {caseset}"]
+    if spec:
+        lines.append("SPEC_CASES: " + " ".join(spec))
+    summary_write(replay_dir / "summary.txt", lines + ["OK: STL verification complete"])
     write_manifest(replay_dir)
 
 
+def write_replay_matrix(path: Path, caseset: str, base_out: Path, ids: list, fps: list) -> None:
+    lines = [
+        "STL REPLAY MATRIX",
+        f"caseset: {caseset}",
+        f"replays: {len(ids)}",
+    ]
+    for i, (rid, fp) in enumerate(zip(ids, fps)):
+        lines.append(f"REPLAY_{rid}  PYTHONHASHSEED={i}  MANIFEST_SHA256={fp or 'MISSING'}")
+    lines.append("")
+    lines.append("matrix (= same manifest fingerprint, x = different):")
+    lines.append("   " + " ".join(ids))
+    for rid, fp in zip(ids, fps):
+        lines.append(f"{rid}  " + " ".join("=" if fp and fp == other else "x" for other in fps))
+    ok = bool(fps[0]) and len(set(fps)) == 1
+    if not ok:
+        lines.append("")
+        ref = base_out / f"REPLAY_{ids[0]}"
+        for rid, fp in zip(ids[1:], fps[1:]):
+            if fp != fps[0]:
+                other = base_out / f"REPLAY_{rid}"
+                diff = manifest_diff(ref, other)
+                lines.append(f"REPLAY_{rid} vs REPLAY_{ids[0]}: {len(diff)} differing file(s)")
+                lines += [f"  {rel}" for rel in diff]
+                lines += first_divergence(ref, other, diff)
+    lines.append("RESULT: " + ("PASS" if ok else "FAIL"))
+    summary_write(path, lines)
+
+
+def run_replays(args, out_dir: Path, base_out: Path, env) -> int:
+    # K replays, each a separate interpreter (own PYTHONHASHSEED and REPLAY_<id> tree),
+    # run concurrently and compared by their top-level manifest fingerprints.
+    ids = REPLAY_IDS[:args.replays]
+
+    def one(i: int):
+        cmd = [
+            sys.executable, str(Path(__file__).resolve()),
+            "--profile", args.profile,
+            "--out_dir", str(out_dir),
+            "--run_id", ids[i],
+            "--cases", args.cases,
+            "--jobs", str(args.jobs),
+            "--hash_jobs", str(args.hash_jobs),
+            "--stage_hashseed", str(i),
+        ]
+        if args.case_spec:
+            cmd += ["--case_spec", str(Path(args.case_spec).resolve())]
+        cmd += ["--perf_out", str(base_out / f"perf_REPLAY_{ids[i]}.json")]
+        if args.perf_compare:
+            cmd += ["--perf_compare", str(Path(args.perf_compare).resolve()), "--perf_threshold", str(args.perf_threshold)]
+        if args.in_process:
+            cmd.append("--in_process")
+        if args.hash_mmap:
+            cmd.append("--hash_mmap")
+        replay_env = dict(env)
+        replay_env["PYTHONHASHSEED"] = str(i)
+        return subprocess.run(cmd, env=replay_env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(ids), os.cpu_count() or 1)) as ex:
+        results = list(ex.map(one, range(len(ids))))
+
+    for cp in results:
+        if cp.returncode != EXIT_OK:
+            sys.stdout.write(cp.stdout)
+            sys.stderr.write(cp.stderr)
+            return cp.returncode
+
+    fps = []
+    for rid in ids:
+        m = base_out / f"REPLAY_{rid}" / "MANIFEST.sha256"
+        fps.append(sha256_file(m) if m.exists() else "")
+    write_replay_matrix(base_out / "REPLAY_MATRIX.txt", args.cases, base_out, ids, fps)
+
+    ok = bool(fps[0]) and len(set(fps)) == 1
+    if not ok:
+        sys.stderr.write(f"see {base_out / 'REPLAY_MATRIX.txt'}\n")
+    sys.stdout.write("VERIFY_REPLAY: PASS\n" if ok else "VERIFY_REPLAY: FAIL\n")
+    return EXIT_OK if ok else EXIT_FAIL
+
+
 def parse_args():
     ap = argparse.ArgumentParser(prog="stl_master_verify.py")
     ap.add_argument("--profile", required=True, choices=["public"])
     ap.add_argument("--out_dir", required=True)
     ap.add_argument("--verify_replay", action="store_true")
-    ap.add_argument("--run_id", choices=["A", "B"], default="A")
-    ap.add_argument("--cases", choices=["core", "full"], default="core")
-    return ap.parse_args()
+    ap.add_argument("--run_id", choices=REPLAY_IDS, default="A")
+    ap.add_argument("--stage_hashseed", type=int, default=0,
+                    help="PYTHONHASHSEED for every stage (--verify_replay gives replay i seed i)")
+    ap.add_argument("--replays", type=int, default=2,
+                    help="--verify_replay: number of concurrent replays (REPLAY_A, REPLAY_B, ...)")
+    ap.add_argument("--cases", choices=["core", "full", "spec"], default="core",
+                    help="Built-in caseset; 'spec' runs only the --case_spec cases")
+    ap.add_argument("--case_spec", default="", help="JSON/TOML file declaring extra cases as stage graphs")
+    ap.add_argument("--in_process", action="store_true",
+                    help="Call stage entry points in this interpreter instead of one subprocess per stage")
+    ap.add_argument("--jobs", type=int, default=1, help="Run independent cases in N worker processes")
+    ap.add_argument("--hash_jobs", type=int, default=1, help="Hash manifest files on N threads (same MANIFEST.sha256)")
+    ap.add_argument("--hash_mmap", action="store_true", help="Hash manifest files through mmap instead of chunked reads")
+    ap.add_argument("--stage_cache", default="",
+                    help="Reuse stage outputs from this content-addressed cache directory (not with --verify_replay)")
+    ap.add_argument("--perf_out", default="",
+                    help="Per-stage perf JSON (default: <out_dir>/stl_verify_out/perf.json, outside the replay tree)")
+    ap.add_argument("--perf_compare", default="", help="Baseline perf JSON; regressions above --perf_threshold fail the run")
+    ap.add_argument("--perf_threshold", type=float, default=0.25,
+                    help="Allowed growth per stage metric for --perf_compare (fraction, default 0.25)")
+    args = ap.parse_args()
+    if args.perf_threshold < 0:
+        ap.error("--perf_threshold must be >= 0")
+    if args.cases == "spec" and not args.case_spec:
+        ap.error("--cases spec requires --case_spec")
+    if args.stage_cache and args.verify_replay:
+        ap.error("--stage_cache cannot be combined with --verify_replay (replays must recompute every stage)")
+    if not (0 <= args.stage_hashseed <= 4294967295):
+        ap.error("--stage_hashseed must be between 0 and 4294967295")
+    if args.jobs < 1:
+        ap.error("--jobs must be >= 1")
+    if args.hash_jobs < 1:
+        ap.error("--hash_jobs must be >= 1")
+    if not (2 <= args.replays <= len(REPLAY_IDS)):
+        ap.error(f"--replays must be between 2 and {len(REPLAY_IDS)}")
+    return args
 
 
 def main():
@@ -377,7 +1138,24 @@ def main():
     except SystemExit:
         return EXIT_ARGS
 
-    env = build_env()
+    global HASH_JOBS, HASH_MMAP
+    HASH_JOBS, HASH_MMAP = args.hash_jobs, args.hash_mmap
+
+    spec = None
+    if args.case_spec:
+        try:
+            spec = load_case_spec(Path(args.case_spec))
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"ERROR: --case_spec: {e}\n")
+            return EXIT_ARGS
+
+    env = build_env(args.stage_hashseed)
+    if args.in_process and not args.verify_replay and os.environ.get("PYTHONHASHSEED") != env["PYTHONHASHSEED"]:
+        # In-process stages hash with this interpreter's seed: restart under the stage seed.
+        return subprocess.run([sys.executable] + sys.argv, env=env).returncode
+    run = run_in_process if args.in_process else run_py
+    if args.stage_cache:
+        run = StageCache(Path(args.stage_cache).resolve(), run)
 
     out_dir = Path(args.out_dir).resolve()
     base_out = out_dir / "stl_verify_out"
@@ -385,23 +1163,24 @@ def main():
 
     try:
         if args.verify_replay:
-            replay_a = base_out / "REPLAY_A"
-            replay_b = base_out / "REPLAY_B"
-            ensure_clean_dir(replay_a)
-            ensure_clean_dir(replay_b)
-
-            run_caseset(args.cases, replay_a, env)
-            run_caseset(args.cases, replay_b, env)
-
-            ok = compare_dirs(replay_a, replay_b)
+            return run_replays(args, out_dir, base_out, env)
 
-            sys.stdout.write("VERIFY_REPLAY: PASS\n" if ok else "VERIFY_REPLAY: FAIL\n")
-            return EXIT_OK if ok else EXIT_FAIL
-
-        replay_dir = base_out / ("REPLAY_A" if args.run_id == "A" else "REPLAY_B")
+        replay_dir = base_out / f"REPLAY_{args.run_id}"
         ensure_clean_dir(replay_dir)
-        run_caseset(args.cases, replay_dir, env)
+        t0 = time.perf_counter()
+        run_caseset(args.cases, replay_dir, env, PerfRun(replay_dir, run), args.jobs, spec)
+        perf = write_perf(Path(args.perf_out) if args.perf_out else base_out / "perf.json", args,
+                          time.perf_counter() - t0)
         sys.stdout.write("OK: STL verification complete\n")
+
+        if args.perf_compare:
+            baseline = json.loads(Path(args.perf_compare).read_text(encoding="utf-8"))
+            regressions = perf_regressions(perf, baseline, args.perf_threshold)
+            for line in regressions:
+                sys.stderr.write(f"PERF_REGRESSION: {line}\n")
+            sys.stdout.write("PERF_COMPARE: FAIL\n" if regressions else "PERF_COMPARE: PASS\n")
+            if regressions:
+                return EXIT_FAIL
         return EXIT_OK
 
     except FileNotFoundError as e:
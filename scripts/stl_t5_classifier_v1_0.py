@@ -2,40 +2,35 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import concurrent.futures
 import csv
-import hashlib
+import io
+import itertools
 import os
 import sys
-
-T5_Z0 = "Z0"
-T5_EPLUS = "Eplus"
-T5_S = "S"
-T5_EMINUS = "Eminus"
-T5_ZSTAR = "Zstar"
-
-def phi_T(state: str) -> str:
-    if state == T5_S:
-        return "TRUE"
-    if state == T5_ZSTAR:
-        return "FALSE"
-    return "UNDEFINED"
-
-def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-def write_manifest(out_dir: str, rel_paths: list) -> None:
-    manifest_path = os.path.join(out_dir, "MANIFEST.sha256")
-    lines = []
-    for rel in sorted(rel_paths):
-        p = os.path.join(out_dir, rel)
-        digest = sha256_file(p)
-        lines.append(f"{digest}  {rel}")
-    with open(manifest_path, "w", encoding="utf-8", newline="\n") as f:
-        f.write("\n".join(lines) + "\n")
+from array import array
+
+from stl_core.manifest import HashingFileIO, open_hashed, write_manifest, written_sha256
+from stl_core.t5 import (
+    PHI_ALL,
+    T5_ALL,
+    TRACE_HEADER,
+    StreamingT5Classifier,
+    clamp01,
+    classify_state,
+    compute_r,
+    count_states,
+    format_trace_row,
+    in_stable_false,
+    in_stable_true,
+    phi_T,
+    seal_kv,
+    unseal_kv,
+    validate_params,
+    write_summary,
+    write_trace_csv,
+)
+from stl_csv_fast_v1_0 import iter_csv_column_blocks, iter_csv_column_blocks_from, read_csv_columns
 
 def parse_float(s: str, field: str, line_no: int) -> float:
     try:
@@ -44,87 +39,560 @@ def parse_float(s: str, field: str, line_no: int) -> float:
         raise ValueError(f"Invalid float for {field} on line {line_no}: {s}")
     return v
 
-def clamp01(x: float) -> float:
-    if x < 0.0:
-        return 0.0
-    if x > 1.0:
-        return 1.0
-    return x
-
-def compute_r(delta_d: float, eps: float) -> int:
-    if delta_d > eps:
-        return 1
-    if delta_d < -eps:
-        return -1
-    return 0
-
-def in_stable_true(d: float, tau_s: float) -> bool:
-    return d >= tau_s
+def write_sealed(path: str, data: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
 
-def in_stable_false(d: float, tau_l: float) -> bool:
-    return d <= tau_l
+def save_checkpoint(path: str, clf: StreamingT5Classifier) -> None:
+    write_sealed(path, clf.to_checkpoint())
 
-def in_mid(d: float, tau_l: float, tau_s: float) -> bool:
-    return (d > tau_l) and (d < tau_s)
+def load_checkpoint(path: str) -> StreamingT5Classifier:
+    with open(path, "rb") as f:
+        return StreamingT5Classifier.from_checkpoint(f.read())
 
-def stable_window_ok(ds: list, idx: int, W: int, tau_l: float, tau_s: float) -> bool:
-    if W <= 1:
-        return True
-    start = idx - (W - 1)
-    if start < 0:
-        return False
-    d0 = ds[idx]
-    if in_stable_true(d0, tau_s):
-        for j in range(start, idx + 1):
-            if not in_stable_true(ds[j], tau_s):
-                return False
-        return True
-    if in_stable_false(d0, tau_l):
-        for j in range(start, idx + 1):
-            if not in_stable_false(ds[j], tau_l):
-                return False
-        return True
-    return False
-
-def classify_state(d: float, r: int, s: int, tau_l: float, tau_s: float) -> str:
-    if d >= tau_s and s == 1:
-        return T5_S
-    if d <= tau_l and s == 1:
-        return T5_ZSTAR
-    if in_mid(d, tau_l, tau_s) and r == 1:
-        return T5_EPLUS
-    if in_mid(d, tau_l, tau_s) and r == -1:
-        return T5_EMINUS
-    return T5_Z0
+def hash_opts(args) -> dict:
+    return {"jobs": args.hash_jobs, "use_mmap": args.hash_mmap}
 
 def ensure_dir(p: str) -> None:
     os.makedirs(p, exist_ok=True)
 
-def read_input_csv(path: str) -> tuple[list, list]:
-    ts = []
-    ds = []
+def iter_input_csv(path: str):
+    for ts, ds in iter_csv_column_blocks(path, ["t", "d"], empty_label="t or d"):
+        for t_val, d_val in zip(ts, ds):
+            yield t_val, clamp01(d_val)
+
+def read_input_csv(path: str) -> tuple[array, array]:
+    ts, ds = read_csv_columns(path, ["t", "d"], empty_label="t or d")
+    if len(ts) == 0:
+        raise ValueError("No rows found in input CSV.")
+    if not (min(ds) >= 0.0 and max(ds) <= 1.0):
+        ds = array("d", [0.0 if x < 0.0 else 1.0 if x > 1.0 else x for x in ds])
+    return ts, ds
+
+def iter_chunks(it, chunk_rows: int):
+    chunk = []
+    for x in it:
+        chunk.append(x)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def classify_stream(in_csv: str, out_csv, clf: StreamingT5Classifier, chunk_rows: int,
+                    bin_writer=None, seg_writer=None):
+    # Bounded-memory path: typed column blocks from stl_csv_fast are classified
+    # and written chunk_rows samples at a time, so memory holds one reader block
+    # plus one chunk. Only the classifier state (prev d, run lengths, counts)
+    # crosses chunk boundaries. Returns the SHA-256 of out_csv (None when no CSV
+    # is written); on failure the partial out_csv is removed.
+    f = open_hashed(out_csv, newline="") if out_csv else None
+    try:
+        w = csv.writer(f) if f else None
+        if w:
+            w.writerow(TRACE_HEADER)
+        for block_ts, block_ds in iter_csv_column_blocks(in_csv, ["t", "d"], empty_label="t or d"):
+            for a in range(0, len(block_ds), chunk_rows):
+                ts = block_ts[a:a + chunk_rows]
+                ds = array("d", map(clamp01, block_ds[a:a + chunk_rows]))
+                deltas, rs, ss, states, collapses = clf.extend(ts, ds)
+                if w:
+                    w.writerows(map(format_trace_row, ts, ds, deltas, rs, ss, states, collapses))
+                if bin_writer is not None:
+                    bin_writer.append(ts, ds, deltas, rs, ss, states, collapses)
+                if seg_writer is not None:
+                    seg_writer.extend(ts, states, collapses)
+        if clf.rows == 0:
+            raise ValueError("No rows found in input CSV.")
+    except BaseException:
+        if f:
+            f.close()
+            if os.path.exists(out_csv):
+                os.remove(out_csv)
+        raise
+    if f:
+        f.close()
+    return written_sha256(f) if f else None
+
+APPEND_MAGIC = "STL_T5_APPEND_STATE v2"
+APPEND_STATE_NAME = "append_state.txt"
+
+def run_append(args, out_csv: str, summary: str) -> int:
+    # Incremental refresh of out_dir from a growing input CSV.
+    # append_state.txt (sealed like a checkpoint) holds the classifier state, the
+    # input byte offset/line number already consumed, the input header and the
+    # trace size, so only new rows are parsed, classified and appended. Only
+    # newline-terminated rows are consumed. The manifest digest of the trace is
+    # a plain SHA-256 of the whole file, recomputed with hashlib after each
+    # append (chunked reads; --hash_mmap applies): parsing and classification
+    # scale with the new rows, that rehash still scales with the whole trace.
+    # On failure the trace is cut back to its size before the append (removed
+    # on a first run) and the state is left untouched, so a later append
+    # resumes from the last good state.
+    state_path = os.path.join(args.out_dir, APPEND_STATE_NAME)
+    if os.path.exists(state_path):
+        with open(state_path, "rb") as f:
+            kv = unseal_kv(f.read(), APPEND_MAGIC)
+        clf = StreamingT5Classifier.from_checkpoint_items(kv)
+        if (clf.W, clf.tau_s, clf.tau_l, clf.eps) != (args.W, args.tau_s, args.tau_l, args.eps):
+            print("ERROR: append state parameters do not match W/tau_s/tau_l/eps", file=sys.stderr)
+            return 2
+        in_offset = int(kv["in_offset"])
+        line_no = int(kv["in_line_no"])
+        header = kv["in_header"]
+        if not os.path.exists(out_csv) or os.path.getsize(out_csv) != int(kv["trace_size"]):
+            raise ValueError(f"{out_csv} does not match {APPEND_STATE_NAME}; remove the state to rebuild")
+        mode = "ab"
+        start_size = int(kv["trace_size"])
+    else:
+        clf = StreamingT5Classifier(args.W, args.tau_s, args.tau_l, args.eps)
+        in_offset = 0
+        line_no = 2
+        header = None
+        mode = "wb"
+        start_size = None
+
+    with open(args.in_csv, "rb") as fin:
+        first = fin.readline()
+        size = os.fstat(fin.fileno()).st_size
+    if not first.endswith(b"\n"):
+        raise ValueError("CSV has no header row.")
+    first_text = first.decode("utf-8").rstrip("\r\n")
+    if header is None:
+        header = first_text
+    elif header != first_text:
+        raise ValueError(f"Input header changed since last append: {first_text}")
+    if size < in_offset:
+        raise ValueError("Input CSV is shorter than the last appended offset")
+
+    try:
+        with open(out_csv, mode) as fout:
+            if mode == "wb":
+                hdr = io.StringIO()
+                csv.writer(hdr).writerow(TRACE_HEADER)
+                fout.write(hdr.getvalue().encode("utf-8"))
+            blocks = iter_csv_column_blocks_from(args.in_csv, ["t", "d"], empty_label="t or d",
+                                                 offset=in_offset, line_no=line_no)
+            for (ts, ds), in_offset, line_no in blocks:
+                buf = io.StringIO()
+                w = csv.writer(buf)
+                for t_val, d_val in zip(ts, ds):
+                    d_val = clamp01(d_val)
+                    delta_d, r, s, st, ph = clf.push(t_val, d_val)
+                    w.writerow(format_trace_row(t_val, d_val, delta_d, r, s, st, ph))
+                fout.write(buf.getvalue().encode("utf-8"))
+            trace_size = fout.tell()
+
+        if clf.rows == 0:
+            raise ValueError("No rows found in input CSV.")
+
+        summary_sha = write_summary(summary, args, clf.rows, clf.counts, clf.collapse_counts)
+        write_manifest(args.out_dir, ["stl_trace_out.csv", "summary.txt"], {"summary.txt": summary_sha},
+                       **hash_opts(args))
+
+        items = clf.checkpoint_items() + [
+            ("in_offset", str(in_offset)),
+            ("in_line_no", str(line_no)),
+            ("in_header", header),
+            ("trace_size", str(trace_size)),
+        ]
+        write_sealed(state_path, seal_kv(APPEND_MAGIC, items))
+    except BaseException:
+        if start_size is None:
+            if os.path.exists(out_csv):
+                os.remove(out_csv)
+        else:
+            os.truncate(out_csv, start_size)
+        raise
+
+    print(f"WROTE: {out_csv} (rows={clf.rows})")
+    print(f"WROTE: {summary}")
+    print(f"WROTE: {os.path.join(args.out_dir, 'MANIFEST.sha256')}")
+    print(f"WROTE: {state_path}")
+    return 0
+
+def classify_counts(in_csv: str, clf: StreamingT5Classifier) -> None:
+    # Counts-only pass: one streaming read, constant memory, no per-row output.
+    push = clf.push
+    for t, d in iter_input_csv(in_csv):
+        push(t, d)
+    if clf.rows == 0:
+        raise ValueError("No rows found in input CSV.")
+
+def classify_shard(task: tuple) -> tuple:
+    # Worker: warm a fresh classifier on the halo (the W-1 samples before the shard,
+    # at least one so prev d is set), then classify and format the shard rows.
+    halo, ts, ds, W, tau_s, tau_l, eps = task
+    clf = StreamingT5Classifier(W, tau_s, tau_l, eps)
+    for d in halo:
+        clf.push(None, d)
+    clf.counts = {k: 0 for k in T5_ALL}
+    clf.collapse_counts = {k: 0 for k in PHI_ALL}
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    for i in range(len(ds)):
+        delta_d, r, s, st, ph = clf.push(ts[i], ds[i])
+        w.writerow(format_trace_row(ts[i], ds[i], delta_d, r, s, st, ph))
+    return buf.getvalue(), clf.counts, clf.collapse_counts
+
+def classify_sharded(args, ts: list, ds: list, out_csv: str) -> tuple[dict, dict, str]:
+    # Contiguous shards classified in a process pool and stitched in order.
+    # Returns state counts, collapse counts and the SHA-256 of out_csv.
+    n = len(ds)
+    shard_rows = max(1, -(-n // args.jobs))
+    halo_len = max(args.W - 1, 1)
+    tasks = []
+    for a in range(0, n, shard_rows):
+        b = min(a + shard_rows, n)
+        halo = ds[max(0, a - halo_len):a]
+        tasks.append((halo, ts[a:b], ds[a:b], args.W, args.tau_s, args.tau_l, args.eps))
+
+    counts = {k: 0 for k in T5_ALL}
+    collapse_counts = {k: 0 for k in PHI_ALL}
+    with open_hashed(out_csv, newline="") as f:
+        w = csv.writer(f)
+        w.writerow(TRACE_HEADER)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as ex:
+            for text, c, cc in ex.map(classify_shard, tasks):
+                f.write(text)
+                for k in T5_ALL:
+                    counts[k] += c[k]
+                for k in PHI_ALL:
+                    collapse_counts[k] += cc[k]
+    return counts, collapse_counts, written_sha256(f)
+
+MULTI_PREFIX = "d_"
+LONG_TRACE_HEADER = ["series"] + TRACE_HEADER
+
+def series_name(col: str) -> str:
+    name = col[len(MULTI_PREFIX):]
+    if name == "" or any(not (c.isalnum() or c in "_-.") for c in name):
+        raise ValueError(f"Unsupported series column name: {col}")
+    return name
+
+def iter_input_wide_csv(path: str, cols: list):
+    # Wide input: one t column plus one d_<series> column per proposition.
     with open(path, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        if r.fieldnames is None:
+        r = csv.reader(f)
+        header = next(r, None)
+        if header is None:
             raise ValueError("CSV has no header row.")
-        req = {"t", "d"}
-        missing = req - set([x.strip() for x in r.fieldnames])
-        if missing:
-            raise ValueError(f"CSV missing required columns: {sorted(list(missing))}. Required: t,d")
+        header = [x.strip() for x in header]
+        if "t" not in header:
+            raise ValueError("CSV missing required columns: ['t']. Required: t,d_*")
+        t_pos = header.index("t")
+        d_pos = [header.index(c) for c in cols]
+        width = len(header)
         line_no = 1
         for row in r:
             line_no += 1
-            t = row.get("t", "").strip()
-            d = row.get("d", "").strip()
-            if t == "" or d == "":
-                raise ValueError(f"Empty t or d on line {line_no}")
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            t = row[t_pos].strip()
+            if t == "":
+                raise ValueError(f"Empty t on line {line_no}")
             t_val = parse_float(t, "t", line_no)
-            d_val = clamp01(parse_float(d, "d", line_no))
-            ts.append(t_val)
-            ds.append(d_val)
-    if len(ts) == 0:
+            d_vals = []
+            for c, j in zip(cols, d_pos):
+                d = row[j].strip()
+                if d == "":
+                    raise ValueError(f"Empty {c} on line {line_no}")
+                d_vals.append(clamp01(parse_float(d, c, line_no)))
+            yield t_val, d_vals
+
+def read_wide_header(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        header = next(csv.reader(f), None)
+    if header is None:
+        raise ValueError("CSV has no header row.")
+    cols = [x.strip() for x in header if x.strip().startswith(MULTI_PREFIX)]
+    if not cols:
+        raise ValueError("CSV has no d_* columns. Required: t,d_*")
+    names = [series_name(c) for c in cols]
+    if len(set(names)) != len(names):
+        raise ValueError("CSV has duplicate d_* columns.")
+    return cols
+
+def classify_multi(args, cols: list) -> tuple[list, list]:
+    # One read of the wide input; per-series StreamingT5Classifier state.
+    # layout "long": single stl_trace_out.csv with a leading series column.
+    # layout "per_series": stl_trace_out__<series>.csv per column.
+    # Every input row yields one output row per series, so a chunk holds
+    # chunk_rows // len(cols) input rows: at most chunk_rows output rows are
+    # buffered whatever the series count.
+    names = [series_name(c) for c in cols]
+    input_rows = max(1, args.chunk_rows // len(cols))
+    clfs = [StreamingT5Classifier(args.W, args.tau_s, args.tau_l, args.eps) for _ in cols]
+
+    rels = []
+    files = []
+    writers = []
+    try:
+        if args.multi_layout == "long":
+            rel = "stl_trace_out.csv"
+            f = open(os.path.join(args.out_dir, rel), "w", encoding="utf-8", newline="")
+            files.append(f)
+            writers.append(csv.writer(f))
+            writers[0].writerow(LONG_TRACE_HEADER)
+            rels.append(rel)
+        else:
+            for name in names:
+                rel = f"stl_trace_out__{name}.csv"
+                f = open(os.path.join(args.out_dir, rel), "w", encoding="utf-8", newline="")
+                files.append(f)
+                w = csv.writer(f)
+                w.writerow(TRACE_HEADER)
+                writers.append(w)
+                rels.append(rel)
+
+        for chunk in iter_chunks(iter_input_wide_csv(args.in_csv, cols), input_rows):
+            out_rows = [[] for _ in writers]
+            for t, d_vals in chunk:
+                for k in range(len(cols)):
+                    d = d_vals[k]
+                    delta_d, r, s, st, ph = clfs[k].push(t, d)
+                    row = format_trace_row(t, d, delta_d, r, s, st, ph)
+                    if args.multi_layout == "long":
+                        out_rows[0].append([names[k]] + row)
+                    else:
+                        out_rows[k].append(row)
+            for w, rows in zip(writers, out_rows):
+                w.writerows(rows)
+    finally:
+        for f in files:
+            f.close()
+
+    if clfs[0].rows == 0:
         raise ValueError("No rows found in input CSV.")
-    return ts, ds
+    return rels, clfs
+
+def write_multi_summary(path: str, args, cols: list, clfs: list) -> None:
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("STL T5 CLASSIFIER SUMMARY (MULTI-SERIES)\n")
+        f.write(f"in_csv = {args.in_csv}\n")
+        f.write(f"W = {args.W}\n")
+        f.write(f"tau_s = {args.tau_s}\n")
+        f.write(f"tau_l = {args.tau_l}\n")
+        f.write(f"eps = {args.eps}\n")
+        f.write(f"rows = {clfs[0].rows}\n")
+        f.write(f"series = {len(cols)}\n")
+        f.write(f"layout = {args.multi_layout}\n")
+        for c, clf in zip(cols, clfs):
+            f.write(f"series {series_name(c)}:\n")
+            f.write("  counts:\n")
+            for k in T5_ALL:
+                f.write(f"    {k} = {clf.counts[k]}\n")
+            f.write("  collapse_counts:\n")
+            for k in PHI_ALL:
+                f.write(f"    {k} = {clf.collapse_counts[k]}\n")
+
+def parse_grid(text: str, cast, field: str) -> list:
+    vals = []
+    for x in text.split(","):
+        x = x.strip()
+        if x == "":
+            continue
+        try:
+            v = cast(x)
+        except ValueError:
+            raise ValueError(f"Invalid value for {field} grid: {x}")
+        if v not in vals:
+            vals.append(v)
+    if not vals:
+        raise ValueError(f"Empty {field} grid")
+    return vals
+
+def run_lengths(flags: list) -> list:
+    out = []
+    n = 0
+    for x in flags:
+        n = n + 1 if x else 0
+        out.append(n)
+    return out
+
+def classify_grid_point(ds: list, rs: list, run_hi: list, run_lo: list, W: int, tau_s: float, tau_l: float) -> tuple:
+    # Same decision as StreamingT5Classifier, driven by shared precomputed r and run lengths.
+    ss = []
+    states = []
+    collapses = []
+    for i in range(len(ds)):
+        if W <= 1 or run_hi[i] >= W or run_lo[i] >= W:
+            s = 1
+        else:
+            s = 0
+        st = classify_state(ds[i], rs[i], s, tau_l, tau_s)
+        ss.append(s)
+        states.append(st)
+        collapses.append(phi_T(st))
+    return ss, states, collapses
+
+SWEEP_COUNTS_HEADER = ["grid_id", "W", "tau_s", "tau_l", "eps", "rows"] + T5_ALL + PHI_ALL
+
+def run_sweep(args, ts: list, ds: list, grid: list) -> list:
+    # Parse once, share deltas (all points), r (per eps) and run lengths (per tau_s / tau_l).
+    deltas = [0.0] + [ds[i] - ds[i - 1] for i in range(1, len(ds))]
+    rs_by_eps = {}
+    run_hi_by_tau = {}
+    run_lo_by_tau = {}
+
+    rels = []
+    table = []
+    for n, (W, tau_s, tau_l, eps) in enumerate(grid, start=1):
+        if eps not in rs_by_eps:
+            rs_by_eps[eps] = [compute_r(x, eps) for x in deltas]
+        if tau_s not in run_hi_by_tau:
+            run_hi_by_tau[tau_s] = run_lengths([in_stable_true(d, tau_s) for d in ds])
+        if tau_l not in run_lo_by_tau:
+            run_lo_by_tau[tau_l] = run_lengths([in_stable_false(d, tau_l) for d in ds])
+
+        rs = rs_by_eps[eps]
+        ss, states, collapses = classify_grid_point(ds, rs, run_hi_by_tau[tau_s], run_lo_by_tau[tau_l], W, tau_s, tau_l)
+        counts, collapse_counts = count_states(states, collapses)
+
+        grid_id = f"GRID_{n:04d}"
+        grid_dir = os.path.join(args.out_dir, grid_id)
+        ensure_dir(grid_dir)
+        point = argparse.Namespace(in_csv=args.in_csv, W=W, tau_s=tau_s, tau_l=tau_l, eps=eps)
+        if args.sweep_traces:
+            write_trace_csv(os.path.join(grid_dir, "stl_trace_out.csv"), ts, ds, deltas, rs, ss, states, collapses)
+            rels.append(f"{grid_id}/stl_trace_out.csv")
+        write_summary(os.path.join(grid_dir, "summary.txt"), point, len(ds), counts, collapse_counts)
+        rels.append(f"{grid_id}/summary.txt")
+
+        table.append([grid_id, W, tau_s, tau_l, eps, len(ds)]
+                     + [counts[k] for k in T5_ALL] + [collapse_counts[k] for k in PHI_ALL])
+
+    with open(os.path.join(args.out_dir, "sweep_counts.csv"), "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(SWEEP_COUNTS_HEADER)
+        for row in table:
+            w.writerow(row)
+    rels.append("sweep_counts.csv")
+    return rels
+
+PHI_BY_CODE = ["UNDEFINED", "UNDEFINED", "TRUE", "UNDEFINED", "FALSE"]
+
+def classify_arrays_numpy(ds, W: int, tau_s: float, tau_l: float, eps: float) -> tuple:
+    # Vectorized batch classifier (optional NumPy backend).
+    # Returns NumPy arrays (deltas, rs, ss, codes) matching StreamingT5Classifier;
+    # codes index into T5_ALL (and PHI_BY_CODE for phi_T).
+    import numpy as np
+
+    d = np.asarray(ds, dtype=np.float64)
+    n = d.shape[0]
+
+    delta = np.zeros(n, dtype=np.float64)
+    if n > 1:
+        delta[1:] = d[1:] - d[:-1]
+
+    r = np.zeros(n, dtype=np.int8)
+    r[delta > eps] = 1
+    r[delta < -eps] = -1
+
+    hi = d >= tau_s
+    lo = d <= tau_l
+    mid = (d > tau_l) & (d < tau_s)
+
+    # s[i] = 1 iff the last W samples are all in-tau_s or all in-tau_l (windowed cumsum).
+    if W <= 1:
+        s = np.ones(n, dtype=np.int8)
+    else:
+        s = np.zeros(n, dtype=np.int8)
+        if n >= W:
+            c_hi = np.concatenate(([0], np.cumsum(hi, dtype=np.int64)))
+            c_lo = np.concatenate(([0], np.cumsum(lo, dtype=np.int64)))
+            full_hi = (c_hi[W:] - c_hi[:-W]) == W
+            full_lo = (c_lo[W:] - c_lo[:-W]) == W
+            s[W - 1:] = full_hi | full_lo
+
+    # State codes index into T5_ALL; Z0 is the default.
+    code = np.zeros(n, dtype=np.int8)
+    code[mid & (r == -1)] = 3
+    code[mid & (r == 1)] = 1
+    stable = s == 1
+    code[lo & stable] = 4
+    code[hi & stable] = 2
+
+    return delta, r, s, code
+
+def fixed6_field_numpy(x):
+    # f"{v:.6f}" for every element of a float64 array, as a (rows, width) uint8
+    # matrix of ASCII, right-aligned and left-padded with spaces. v is rounded to
+    # an integer count of 1e-6 and its digits are laid out column by column.
+    # Where v * 1e6 lies within float error of a .5 tie (or is huge / not
+    # finite) that rounding could differ from Python's correctly rounded
+    # decimal, so those elements are formatted by Python instead.
+    import numpy as np
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = x * 1e6
+        mag = np.abs(scaled)
+        unsafe = ~(mag < 2.0 ** 50)
+        unsafe |= np.abs(mag - np.floor(mag) - 0.5) <= mag * 2.0 ** -50
+        k = np.where(unsafe, 0.0, np.rint(mag)).astype(np.int64)
+    ip = k // 1000000
+    frac = k % 1000000
+    fallback = {i: f"{float(x[i]):.6f}".encode("ascii") for i in np.flatnonzero(unsafe).tolist()}
+
+    ndig = len(str(int(ip.max()))) if len(ip) else 1
+    width = max([ndig + 8] + [len(b) for b in fallback.values()])
+    out = np.full((len(x), width), 32, dtype=np.uint8)
+    for j in range(6):
+        out[:, width - 1 - j] = 48 + (frac // 10 ** j) % 10
+    out[:, width - 7] = 46
+    digits = np.ones(len(x), dtype=np.int64)
+    for j in range(ndig):
+        present = ip >= 10 ** j if j else np.ones(len(x), dtype=bool)
+        out[:, width - 8 - j] = np.where(present, 48 + (ip // 10 ** j) % 10, 32)
+        if j:
+            digits += present
+    neg = np.flatnonzero(np.signbit(x) & ~unsafe)
+    out[neg, width - 8 - digits[neg]] = 45
+    for i, b in fallback.items():
+        out[i] = 32
+        out[i, width - len(b):] = np.frombuffer(b, dtype=np.uint8)
+    return out
+
+def name_field_numpy(names: list, codes):
+    # names[code] per element as a (rows, width) uint8 matrix, right-padded with spaces.
+    import numpy as np
+
+    width = max(len(n) for n in names)
+    table = np.array([list(n.ljust(width).encode("ascii")) for n in names], dtype=np.uint8)
+    return table[codes]
+
+def write_trace_csv_numpy(path: str, ts, ds, deltas, rs, ss, codes, chunk_rows: int = 262144) -> str:
+    # write_trace_csv for the NumPy backend. Each chunk of rows is laid out as
+    # one space-padded ASCII matrix (fields, commas, csv.writer's "\r\n") and
+    # the padding is dropped in one pass; no trace field contains a space or
+    # needs quoting. Returns the SHA-256 of the written file.
+    import numpy as np
+
+    comma = np.full((1, 1), 44, dtype=np.uint8)
+    crlf = np.array([[13, 10]], dtype=np.uint8)
+    with io.BufferedWriter(HashingFileIO(path)) as f:
+        f.write((",".join(TRACE_HEADER) + "\r\n").encode("ascii"))
+        for a in range(0, len(ds), chunk_rows):
+            b = a + chunk_rows
+            n = len(ds[a:b])
+            parts = [
+                fixed6_field_numpy(ts[a:b]),
+                fixed6_field_numpy(ds[a:b]),
+                fixed6_field_numpy(deltas[a:b]),
+                name_field_numpy(["-1", "0", "1"], rs[a:b] + 1),
+                name_field_numpy(["0", "1"], ss[a:b]),
+                name_field_numpy(T5_ALL, codes[a:b]),
+                name_field_numpy(PHI_BY_CODE, codes[a:b]),
+            ]
+            cols = []
+            for part in parts:
+                cols += [part, np.repeat(comma, n, axis=0)]
+            cols[-1] = np.repeat(crlf, n, axis=0)
+            flat = np.concatenate(cols, axis=1).ravel()
+            f.write(flat[flat != 32].tobytes())
+    return f.raw.hexdigest()
 
 def write_sample_input_csv(path: str) -> None:
     rows = []
@@ -153,6 +621,57 @@ def write_sample_input_csv(path: str) -> None:
         for (tt, dd) in rows:
             w.writerow([f"{tt:.3f}", f"{dd:.6f}"])
 
+def classify_trace(args, clf: StreamingT5Classifier, out_csv: str, write_csv: bool,
+                   bin_writer=None, seg_writer=None) -> tuple:
+    # Single-trace classification (default, --stream, --jobs, --backend numpy).
+    # Returns (digests, rows, counts, collapse_counts); the writers stay open.
+    digests = {}
+    if args.stream:
+        trace_sha = classify_stream(args.in_csv, out_csv if write_csv else None, clf, args.chunk_rows,
+                                    bin_writer, seg_writer)
+        if trace_sha:
+            digests["stl_trace_out.csv"] = trace_sha
+        rows, counts, collapse_counts = clf.rows, clf.counts, clf.collapse_counts
+    else:
+        ts, ds = read_input_csv(args.in_csv)
+        rows = len(ds)
+        base_counts = dict(clf.counts)
+        base_collapse_counts = dict(clf.collapse_counts)
+
+        if args.jobs > 1:
+            counts, collapse_counts, digests["stl_trace_out.csv"] = classify_sharded(args, ts, ds, out_csv)
+        else:
+            if args.backend == "numpy":
+                import numpy as np
+                t_np = np.frombuffer(ts, dtype=np.float64)
+                d_np = np.frombuffer(ds, dtype=np.float64)
+                deltas, rs, ss, codes = classify_arrays_numpy(d_np, args.W, args.tau_s, args.tau_l, args.eps)
+                if write_csv:
+                    digests["stl_trace_out.csv"] = write_trace_csv_numpy(out_csv, t_np, d_np, deltas, rs, ss, codes)
+                code_counts = np.bincount(codes, minlength=len(T5_ALL)).tolist()
+                counts = dict(zip(T5_ALL, code_counts))
+                collapse_counts = {k: 0 for k in PHI_ALL}
+                for phi, c in zip(PHI_BY_CODE, code_counts):
+                    collapse_counts[phi] += c
+                if bin_writer is not None or seg_writer is not None:
+                    deltas, rs, ss = deltas.tolist(), rs.tolist(), ss.tolist()
+                    states = [T5_ALL[k] for k in codes.tolist()]
+                    collapses = [PHI_BY_CODE[k] for k in codes.tolist()]
+            else:
+                deltas, rs, ss, states, collapses = clf.extend(ts, ds)
+                counts, collapse_counts = count_states(states, collapses)
+                if args.resume_from:
+                    rows = clf.rows
+                    counts = {k: base_counts[k] + counts[k] for k in T5_ALL}
+                    collapse_counts = {k: base_collapse_counts[k] + collapse_counts[k] for k in PHI_ALL}
+                if write_csv:
+                    digests["stl_trace_out.csv"] = write_trace_csv(out_csv, ts, ds, deltas, rs, ss, states, collapses)
+            if bin_writer is not None:
+                bin_writer.append(ts, ds, deltas, rs, ss, states, collapses)
+            if seg_writer is not None:
+                seg_writer.extend(ts, states, collapses)
+    return digests, rows, counts, collapse_counts
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--in_csv", required=False, help="Input CSV with columns: t,d (d in [0,1])")
@@ -162,25 +681,112 @@ def main() -> int:
     ap.add_argument("--tau_l", type=float, default=0.05, help="Stable FALSE threshold")
     ap.add_argument("--eps", type=float, default=0.01, help="Derivative threshold")
     ap.add_argument("--make_sample", action="store_true", help="Write a sample input CSV and exit")
+    ap.add_argument("--stream", action="store_true", help="Read, classify and write in bounded chunks (one reader block + --chunk_rows rows in memory)")
+    ap.add_argument("--backend", choices=["python", "numpy"], default="python",
+                    help="Classification backend (numpy is optional; python is the reference)")
+    ap.add_argument("--chunk_rows", type=int, default=65536, help="Rows per chunk in --stream mode; output rows (all series) per chunk with --multi (>=1)")
+    ap.add_argument("--trace_format", choices=["csv", "binary", "both", "none"], default="csv",
+                    help="Trace output: stl_trace_out.csv, stl_trace_out.stlb (binary columnar), both, or none")
+    ap.add_argument("--segments", action="store_true",
+                    help="Also write stl_segments_out.csv (one row per run of identical state)")
+    ap.add_argument("--resume_from", default="", help="Restore classifier state from a checkpoint before classifying")
+    ap.add_argument("--checkpoint_out", default="", help="Write the final classifier state checkpoint to this path")
+    ap.add_argument("--counts_only", action="store_true",
+                    help="Write only summary.txt counts (one streaming pass, no stl_trace_out.csv)")
+    ap.add_argument("--append", action="store_true",
+                    help=f"Incremental refresh: classify only rows appended since the last run ({APPEND_STATE_NAME})")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Classify contiguous shards in N worker processes (W-1 sample halo per shard)")
+    ap.add_argument("--multi", action="store_true",
+                    help="Wide input (t,d_<series>,...): classify every d_* column in one pass")
+    ap.add_argument("--multi_layout", choices=["long", "per_series"], default="long",
+                    help="--multi output: one long-format trace or one trace per series")
+    ap.add_argument("--sweep", action="store_true",
+                    help="Evaluate a parameter grid in one pass (writes GRID_nnnn/ per point + sweep_counts.csv)")
+    ap.add_argument("--sweep_W", default="", help="Comma-separated W values for --sweep (default: --W)")
+    ap.add_argument("--sweep_tau_s", default="", help="Comma-separated tau_s values for --sweep (default: --tau_s)")
+    ap.add_argument("--sweep_tau_l", default="", help="Comma-separated tau_l values for --sweep (default: --tau_l)")
+    ap.add_argument("--sweep_eps", default="", help="Comma-separated eps values for --sweep (default: --eps)")
+    ap.add_argument("--sweep_traces", action="store_true", help="Also write stl_trace_out.csv for every grid point")
+    ap.add_argument("--hash_jobs", type=int, default=1, help="Hash manifest files on N threads (same MANIFEST.sha256)")
+    ap.add_argument("--hash_mmap", action="store_true", help="Hash manifest files through mmap instead of chunked reads")
     args = ap.parse_args()
 
-    if args.W < 1:
-        print("ERROR: W must be >= 1", file=sys.stderr)
+    err = validate_params(args.W, args.tau_s, args.tau_l, args.eps)
+    if err:
+        print(f"ERROR: {err}", file=sys.stderr)
+        return 2
+    if args.chunk_rows < 1:
+        print("ERROR: chunk_rows must be >= 1", file=sys.stderr)
+        return 2
+    if args.backend == "numpy":
+        if args.stream:
+            print("ERROR: --backend numpy is not supported with --stream", file=sys.stderr)
+            return 2
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            print("ERROR: --backend numpy requires NumPy (pip install numpy)", file=sys.stderr)
+            return 2
+
+    if args.jobs < 1:
+        print("ERROR: jobs must be >= 1", file=sys.stderr)
+        return 2
+    if args.hash_jobs < 1:
+        print("ERROR: hash_jobs must be >= 1", file=sys.stderr)
+        return 2
+    if args.jobs > 1 and (args.stream or args.multi or args.sweep or args.backend != "python"):
+        print("ERROR: --jobs > 1 is not supported with --stream, --multi, --sweep or --backend numpy", file=sys.stderr)
         return 2
-    if not (0.0 <= args.tau_l < args.tau_s <= 1.0):
-        print("ERROR: require 0 <= tau_l < tau_s <= 1", file=sys.stderr)
+    if (args.trace_format != "csv" or args.segments) and (args.jobs > 1 or args.multi or args.sweep):
+        print("ERROR: --trace_format other than csv and --segments are not supported with --jobs > 1, --multi or --sweep",
+              file=sys.stderr)
         return 2
-    if args.eps < 0.0:
-        print("ERROR: eps must be >= 0", file=sys.stderr)
+    if (args.resume_from or args.checkpoint_out) and (args.jobs > 1 or args.multi or args.sweep or args.backend != "python"):
+        print("ERROR: --resume_from/--checkpoint_out are not supported with --jobs > 1, --multi, --sweep or --backend numpy",
+              file=sys.stderr)
+        return 2
+    if args.append and (args.stream or args.jobs > 1 or args.multi or args.sweep or args.backend != "python"
+                        or args.trace_format != "csv" or args.segments or args.resume_from or args.checkpoint_out):
+        print("ERROR: --append only supports the default CSV trace (no other modes or trace options)", file=sys.stderr)
+        return 2
+    if args.counts_only and (args.stream or args.jobs > 1 or args.multi or args.sweep or args.append
+                             or args.backend != "python" or args.trace_format != "csv" or args.segments
+                             or args.resume_from or args.checkpoint_out):
+        print("ERROR: --counts_only cannot be combined with other modes or trace options", file=sys.stderr)
+        return 2
+    if args.multi and (args.sweep or args.backend != "python"):
+        print("ERROR: --multi is not supported with --sweep or --backend numpy", file=sys.stderr)
         return 2
 
+    grid = None
+    if args.sweep:
+        if args.stream or args.backend != "python":
+            print("ERROR: --sweep is not supported with --stream or --backend numpy", file=sys.stderr)
+            return 2
+        try:
+            grid = list(itertools.product(
+                parse_grid(args.sweep_W or str(args.W), int, "W"),
+                parse_grid(args.sweep_tau_s or str(args.tau_s), float, "tau_s"),
+                parse_grid(args.sweep_tau_l or str(args.tau_l), float, "tau_l"),
+                parse_grid(args.sweep_eps or str(args.eps), float, "eps"),
+            ))
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 2
+        for (W, tau_s, tau_l, eps) in grid:
+            err = validate_params(W, tau_s, tau_l, eps)
+            if err:
+                print(f"ERROR: grid point W={W} tau_s={tau_s} tau_l={tau_l} eps={eps}: {err}", file=sys.stderr)
+                return 2
+
     ensure_dir(args.out_dir)
 
     sample_path = os.path.join(args.out_dir, "sample_input.csv")
     if args.make_sample:
         write_sample_input_csv(sample_path)
         rels = ["sample_input.csv"]
-        write_manifest(args.out_dir, rels)
+        write_manifest(args.out_dir, rels, **hash_opts(args))
         print(f"WROTE: {sample_path}")
         return 0
 
@@ -188,76 +794,93 @@ def main() -> int:
         print("ERROR: --in_csv required unless --make_sample is used", file=sys.stderr)
         return 2
 
-    ts, ds = read_input_csv(args.in_csv)
+    if args.multi:
+        cols = read_wide_header(args.in_csv)
+        rels, clfs = classify_multi(args, cols)
+        summary = os.path.join(args.out_dir, "summary.txt")
+        write_multi_summary(summary, args, cols, clfs)
+        rels.append("summary.txt")
+        write_manifest(args.out_dir, rels, **hash_opts(args))
+        print(f"WROTE: {len(rels) - 1} trace file(s) for {len(cols)} series ({args.multi_layout})")
+        print(f"WROTE: {summary}")
+        print(f"WROTE: {os.path.join(args.out_dir, 'MANIFEST.sha256')}")
+        return 0
+
+    if grid is not None:
+        ts, ds = read_input_csv(args.in_csv)
+        rels = run_sweep(args, ts, ds, grid)
+        write_manifest(args.out_dir, rels, **hash_opts(args))
+        print(f"WROTE: {os.path.join(args.out_dir, 'sweep_counts.csv')} ({len(grid)} grid points)")
+        print(f"WROTE: {os.path.join(args.out_dir, 'MANIFEST.sha256')}")
+        return 0
 
     out_csv = os.path.join(args.out_dir, "stl_trace_out.csv")
+    out_bin = os.path.join(args.out_dir, "stl_trace_out.stlb")
     summary = os.path.join(args.out_dir, "summary.txt")
+    out_seg = os.path.join(args.out_dir, "stl_segments_out.csv")
+    write_csv = args.trace_format in ("csv", "both")
+
+    if args.append:
+        return run_append(args, out_csv, summary)
+
+    if args.counts_only:
+        clf = StreamingT5Classifier(args.W, args.tau_s, args.tau_l, args.eps)
+        classify_counts(args.in_csv, clf)
+        summary_sha = write_summary(summary, args, clf.rows, clf.counts, clf.collapse_counts)
+        write_manifest(args.out_dir, ["summary.txt"], {"summary.txt": summary_sha}, **hash_opts(args))
+        print(f"WROTE: {summary}")
+        print(f"WROTE: {os.path.join(args.out_dir, 'MANIFEST.sha256')}")
+        return 0
 
-    states = []
-    collapses = []
-    rs = []
-    ss = []
-    deltas = []
-
-    prev_d = ds[0]
-    for i in range(len(ds)):
-        d = ds[i]
-        if i == 0:
-            delta_d = 0.0
-        else:
-            delta_d = d - prev_d
-        r = compute_r(delta_d, args.eps)
-        s_ok = stable_window_ok(ds, i, args.W, args.tau_l, args.tau_s)
-        s = 1 if s_ok else 0
-        st = classify_state(d, r, s, args.tau_l, args.tau_s)
-        ph = phi_T(st)
-
-        deltas.append(delta_d)
-        rs.append(r)
-        ss.append(s)
-        states.append(st)
-        collapses.append(ph)
-
-        prev_d = d
-
-    counts = {T5_Z0: 0, T5_EPLUS: 0, T5_S: 0, T5_EMINUS: 0, T5_ZSTAR: 0}
-    for st in states:
-        counts[st] += 1
+    if args.resume_from:
+        clf = load_checkpoint(args.resume_from)
+        if (clf.W, clf.tau_s, clf.tau_l, clf.eps) != (args.W, args.tau_s, args.tau_l, args.eps):
+            print("ERROR: checkpoint parameters do not match W/tau_s/tau_l/eps", file=sys.stderr)
+            return 2
+    else:
+        clf = StreamingT5Classifier(args.W, args.tau_s, args.tau_l, args.eps)
+
+    # Writers are created only once every check has passed; on failure their
+    # spool/partial files are removed instead of being left in out_dir.
+    bin_writer = None
+    seg_writer = None
+    try:
+        if args.trace_format in ("binary", "both"):
+            from stl_trace_binary_v1_0 import TraceBinaryWriter
+            bin_writer = TraceBinaryWriter(out_bin)
+        if args.segments:
+            from stl_trace_segments_v1_0 import SegmentWriter
+            seg_writer = SegmentWriter(out_seg)
+        digests, rows, counts, collapse_counts = classify_trace(args, clf, out_csv, write_csv, bin_writer, seg_writer)
+        if bin_writer is not None:
+            bin_writer.close()
+            digests["stl_trace_out.stlb"] = bin_writer.sha256
+        if seg_writer is not None:
+            seg_writer.close()
+            digests["stl_segments_out.csv"] = seg_writer.sha256
+    except BaseException:
+        for wr in (bin_writer, seg_writer):
+            if wr is not None:
+                wr.discard()
+        raise
+
+    digests["summary.txt"] = write_summary(summary, args, rows, counts, collapse_counts)
+    if args.checkpoint_out:
+        save_checkpoint(args.checkpoint_out, clf)
+        print(f"WROTE: {args.checkpoint_out}")
+
+    rels = ["summary.txt"]
+    if write_csv:
+        rels.append("stl_trace_out.csv")
+        print(f"WROTE: {out_csv}")
+    if bin_writer is not None:
+        rels.append("stl_trace_out.stlb")
+        print(f"WROTE: {out_bin}")
+    if seg_writer is not None:
+        rels.append("stl_segments_out.csv")
+        print(f"WROTE: {out_seg} ({seg_writer.segments} segments)")
+    write_manifest(args.out_dir, rels, digests, **hash_opts(args))
 
-    with open(out_csv, "w", encoding="utf-8", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["t", "d", "delta_d", "r", "s", "state", "phi_T"])
-        for i in range(len(ds)):
-            w.writerow([
-                f"{ts[i]:.6f}",
-                f"{ds[i]:.6f}",
-                f"{deltas[i]:.6f}",
-                str(rs[i]),
-                str(ss[i]),
-                states[i],
-                collapses[i],
-            ])
-
-    with open(summary, "w", encoding="utf-8", newline="\n") as f:
-        f.write("STL T5 CLASSIFIER SUMMARY\n")
-        f.write(f"in_csv = {args.in_csv}\n")
-        f.write(f"W = {args.W}\n")
-        f.write(f"tau_s = {args.tau_s}\n")
-        f.write(f"tau_l = {args.tau_l}\n")
-        f.write(f"eps = {args.eps}\n")
-        f.write(f"rows = {len(ds)}\n")
-        f.write("counts:\n")
-        for k in [T5_Z0, T5_EPLUS, T5_S, T5_EMINUS, T5_ZSTAR]:
-            f.write(f"  {k} = {counts[k]}\n")
-        f.write("collapse_counts:\n")
-        f.write(f"  TRUE = {sum(1 for x in collapses if x == 'TRUE')}\n")
-        f.write(f"  FALSE = {sum(1 for x in collapses if x == 'FALSE')}\n")
-        f.write(f"  UNDEFINED = {sum(1 for x in collapses if x == 'UNDEFINED')}\n")
-
-    rels = ["stl_trace_out.csv", "summary.txt"]
-    write_manifest(args.out_dir, rels)
-
-    print(f"WROTE: {out_csv}")
     print(f"WROTE: {summary}")
     print(f"WROTE: {os.path.join(args.out_dir, 'MANIFEST.sha256')}")
     return 0
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# asyncio T5 classification service for many concurrent live streams.
+# Standard library only.
+#
+# Line protocol (UTF-8, one sample per line):
+#   request:   <stream>,<t>,<d>
+#   response:  <stream>,<t>,<state>,<phi_T>
+#   error:     ERR,<line_no>,<message>
+#
+# A line longer than MAX_LINE bytes gets a single "line too long" error and
+# is dropped up to its newline.
+#
+# Per-stream state is a StreamingT5Classifier keyed by stream id and shared by
+# all connections. Responses for everything read in one chunk are written in
+# a single batch, and the next chunk is only read after the transport has
+# drained (backpressure).
+
+import argparse
+import asyncio
+import os
+import stat
+import sys
+
+from stl_core.t5 import StreamingT5Classifier, validate_params
+
+READ_CHUNK = 64 * 1024
+MAX_LINE = 4096
+
+class T5Service:
+    def __init__(self, W: int, tau_s: float, tau_l: float, eps: float, max_streams: int):
+        self.W = W
+        self.tau_s = tau_s
+        self.tau_l = tau_l
+        self.eps = eps
+        self.max_streams = max_streams
+        self.streams = {}
+        self.samples = 0
+
+    def classify_line(self, line: str, line_no: int) -> str:
+        parts = line.split(",")
+        if len(parts) != 3:
+            return f"ERR,{line_no},expected stream,t,d"
+        stream, t, d = (x.strip() for x in parts)
+        if stream == "":
+            return f"ERR,{line_no},empty stream id"
+        try:
+            t_val = float(t)
+            d_val = float(d)
+        except ValueError:
+            return f"ERR,{line_no},invalid float"
+        clf = self.streams.get(stream)
+        if clf is None:
+            if len(self.streams) >= self.max_streams:
+                return f"ERR,{line_no},max_streams reached"
+            clf = StreamingT5Classifier(self.W, self.tau_s, self.tau_l, self.eps)
+            self.streams[stream] = clf
+        _, _, _, st, ph = clf.push(t_val, d_val)
+        self.samples += 1
+        return f"{stream},{t_val:.6f},{st},{ph}"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        buf = b""
+        line_no = 0
+        # Set once an unterminated line passed MAX_LINE and was reported; its
+        # remaining bytes are dropped up to and including the next newline.
+        discarding = False
+        try:
+            while True:
+                data = await reader.read(READ_CHUNK)
+                if not data:
+                    break
+                buf += data
+                lines = buf.split(b"\n")
+                buf = lines.pop()
+                out = []
+                for raw in lines:
+                    line_no += 1
+                    if discarding:
+                        discarding = False
+                        continue
+                    if len(raw) > MAX_LINE:
+                        out.append(f"ERR,{line_no},line too long")
+                        continue
+                    line = raw.decode("utf-8", errors="replace").strip()
+                    if line:
+                        out.append(self.classify_line(line, line_no))
+                if len(buf) > MAX_LINE:
+                    if not discarding:
+                        out.append(f"ERR,{line_no + 1},line too long")
+                        discarding = True
+                    buf = b""
+                if out:
+                    writer.write(("\n".join(out) + "\n").encode("utf-8"))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+async def serve(args, service: T5Service) -> None:
+    if args.unix_socket:
+        # Only a stale socket left by an earlier run is replaced; main() refuses
+        # any other file at this path.
+        try:
+            if stat.S_ISSOCK(os.lstat(args.unix_socket).st_mode):
+                os.remove(args.unix_socket)
+        except FileNotFoundError:
+            pass
+        server = await asyncio.start_unix_server(service.handle, path=args.unix_socket,
+                                                 limit=READ_CHUNK, backlog=args.backlog)
+        where = f"unix:{args.unix_socket}"
+    else:
+        server = await asyncio.start_server(service.handle, host=args.host, port=args.port,
+                                            limit=READ_CHUNK, backlog=args.backlog)
+        where = f"tcp:{args.host}:{args.port}"
+    print(f"LISTENING: {where}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1", help="TCP bind address (localhost by default)")
+    ap.add_argument("--port", type=int, default=8765, help="TCP port")
+    ap.add_argument("--unix_socket", default="", help="Serve on this Unix socket path instead of TCP")
+    ap.add_argument("--W", type=int, default=10, help="Stability window length (>=1)")
+    ap.add_argument("--tau_s", type=float, default=0.95, help="Stable TRUE threshold")
+    ap.add_argument("--tau_l", type=float, default=0.05, help="Stable FALSE threshold")
+    ap.add_argument("--eps", type=float, default=0.01, help="Derivative threshold")
+    ap.add_argument("--backlog", type=int, default=1024, help="Listen backlog for concurrent connects")
+    ap.add_argument("--max_streams", type=int, default=100000, help="Maximum number of distinct stream ids")
+    args = ap.parse_args()
+
+    err = validate_params(args.W, args.tau_s, args.tau_l, args.eps)
+    if err:
+        print(f"ERROR: {err}", file=sys.stderr)
+        return 2
+    if args.max_streams < 1:
+        print("ERROR: max_streams must be >= 1", file=sys.stderr)
+        return 2
+    if args.unix_socket and not hasattr(asyncio, "start_unix_server"):
+        print("ERROR: --unix_socket is not supported on this platform", file=sys.stderr)
+        return 2
+    if (args.unix_socket and os.path.lexists(args.unix_socket)
+            and not stat.S_ISSOCK(os.lstat(args.unix_socket).st_mode)):
+        print(f"ERROR: --unix_socket path exists and is not a socket: {args.unix_socket}", file=sys.stderr)
+        return 2
+
+    service = T5Service(args.W, args.tau_s, args.tau_l, args.eps, args.max_streams)
+    try:
+        asyncio.run(serve(args, service))
+    except KeyboardInterrupt:
+        pass
+    print(f"STOPPED: streams={len(service.streams)} samples={service.samples}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
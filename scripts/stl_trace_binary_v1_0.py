@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Binary columnar STL trace format (.stlb) + memory-mapped reader.
+# Standard library only.
+#
+# Layout (little-endian):
+#   header  32 bytes: magic "STLTRACE", version u32, ncols u32, rows u64, reserved u64
+#   columns t, d, delta_d        float64 x rows each
+#   columns r, s, state, phi_T   int8 x rows each
+#
+# state is the index into T5_ALL; phi_T is 1 (TRUE), 0 (FALSE), -1 (UNDEFINED).
+# stl_trace_out.csv can be regenerated byte-identically from the binary trace.
+
+import argparse
+import csv
+import io
+import mmap
+import os
+import shutil
+import struct
+import sys
+from array import array
+
+from stl_core.manifest import HashingFileIO, open_hashed, write_manifest, written_sha256
+from stl_core.t5 import T5_ALL, TRACE_HEADER
+
+STATE_CODE = {st: i for i, st in enumerate(T5_ALL)}
+PHI_CODE = {"TRUE": 1, "FALSE": 0, "UNDEFINED": -1}
+PHI_NAME = {1: "TRUE", 0: "FALSE", -1: "UNDEFINED"}
+
+MAGIC = b"STLTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")
+FLOAT_COLS = ["t", "d", "delta_d"]
+INT8_COLS = ["r", "s", "state", "phi_T"]
+ALL_COLS = FLOAT_COLS + INT8_COLS
+
+def _to_le(a: array) -> array:
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a
+
+class TraceBinaryWriter:
+    # Accepts rows in chunks; each column is spooled to a side file and the
+    # final .stlb is assembled (and hashed) on close(), so memory stays bounded;
+    # sha256 is the .stlb digest once closed.
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self.sha256 = None
+        self.spool_paths = [f"{path}.col{i}.tmp" for i in range(len(ALL_COLS))]
+        self.spools = [open(p, "wb") for p in self.spool_paths]
+
+    def append(self, ts: list, ds: list, deltas: list, rs: list, ss: list, states: list, collapses: list) -> None:
+        cols = [
+            array("d", ts),
+            array("d", ds),
+            array("d", deltas),
+            array("b", rs),
+            array("b", ss),
+            array("b", [STATE_CODE[st] for st in states]),
+            array("b", [PHI_CODE[ph] for ph in collapses]),
+        ]
+        for f, a in zip(self.spools, cols):
+            _to_le(a).tofile(f)
+        self.rows += len(ts)
+
+    def close(self) -> None:
+        for f in self.spools:
+            f.close()
+        with io.BufferedWriter(HashingFileIO(self.path)) as out:
+            out.write(HEADER.pack(MAGIC, VERSION, len(ALL_COLS), self.rows, 0))
+            for p in self.spool_paths:
+                with open(p, "rb") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+        self.sha256 = out.raw.hexdigest()
+        for p in self.spool_paths:
+            os.remove(p)
+
+    def discard(self) -> None:
+        # Abandon the trace: remove the spool files and any partial .stlb.
+        for f in self.spools:
+            f.close()
+        for p in self.spool_paths + [self.path]:
+            if os.path.exists(p):
+                os.remove(p)
+
+class TraceBinaryReader:
+    # Memory-maps a .stlb file; columns are zero-copy memoryviews
+    # ('d' for t/d/delta_d, 'b' for r/s/state/phi_T).
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        size = os.fstat(self._f.fileno()).st_size
+        if size < HEADER.size:
+            self._f.close()
+            raise ValueError(f"Not an STL binary trace (too short): {path}")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, ncols, rows, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not an STL binary trace (bad magic): {path}")
+        if version != VERSION or ncols != len(ALL_COLS):
+            self.close()
+            raise ValueError(f"Unsupported STL binary trace version={version} ncols={ncols}: {path}")
+        expected = HEADER.size + rows * (8 * len(FLOAT_COLS) + len(INT8_COLS))
+        if size != expected:
+            self.close()
+            raise ValueError(f"Truncated STL binary trace: size={size} expected={expected}: {path}")
+        self.rows = rows
+
+        buf = memoryview(self._mm)
+        self._views = [buf]
+        self.columns = {}
+        off = HEADER.size
+        for name in FLOAT_COLS:
+            raw = buf[off:off + 8 * rows]
+            self.columns[name] = self._column(raw, "d")
+            off += 8 * rows
+        for name in INT8_COLS:
+            raw = buf[off:off + rows]
+            self.columns[name] = self._column(raw, "b")
+            off += rows
+
+    def _column(self, raw: memoryview, typecode: str):
+        self._views.append(raw)
+        if sys.byteorder == "big" and typecode == "d":
+            a = array("d", raw.tobytes())
+            a.byteswap()
+            return a
+        v = raw.cast(typecode)
+        self._views.append(v)
+        return v
+
+    def close(self) -> None:
+        for v in reversed(getattr(self, "_views", [])):
+            v.release()
+        self._views = []
+        self.columns = {}
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def write_csv_from_binary(bin_path: str, csv_path: str, chunk_rows: int = 65536) -> tuple[int, str]:
+    # Returns (rows, SHA-256 of csv_path).
+    with TraceBinaryReader(bin_path) as tr:
+        c = tr.columns
+        t, d, dd = c["t"], c["d"], c["delta_d"]
+        r, s, st, ph = c["r"], c["s"], c["state"], c["phi_T"]
+        with open_hashed(csv_path, newline="") as f:
+            w = csv.writer(f)
+            w.writerow(TRACE_HEADER)
+            for a in range(0, tr.rows, chunk_rows):
+                b = min(a + chunk_rows, tr.rows)
+                w.writerows([
+                    [
+                        f"{t[i]:.6f}",
+                        f"{d[i]:.6f}",
+                        f"{dd[i]:.6f}",
+                        str(r[i]),
+                        str(s[i]),
+                        T5_ALL[st[i]],
+                        PHI_NAME[ph[i]],
+                    ]
+                    for i in range(a, b)
+                ])
+        return tr.rows, written_sha256(f)
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in_bin", required=True, help="Binary trace (.stlb) written by stl_t5_classifier_v1_0.py")
+    ap.add_argument("--out_dir", required=True, help="Output directory for stl_trace_out.csv + manifest")
+    args = ap.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    out_csv = os.path.join(args.out_dir, "stl_trace_out.csv")
+    rows, digest = write_csv_from_binary(args.in_bin, out_csv)
+    write_manifest(args.out_dir, ["stl_trace_out.csv"], {"stl_trace_out.csv": digest})
+
+    print(f"WROTE: {out_csv} ({rows} rows)")
+    print(f"WROTE: {os.path.join(args.out_dir, 'MANIFEST.sha256')}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
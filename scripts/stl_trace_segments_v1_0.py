@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Run-length-encoded STL trace segments (stl_segments_out.csv).
+# Standard library only.
+#
+# One row per maximal run of identical T5 state:
+#   start_t, end_t, state, phi_T, row_count
+# t values use the same f"{t:.6f}" formatting as stl_trace_out.csv.
+
+import argparse
+import csv
+import os
+
+from stl_core.manifest import open_hashed, write_manifest, written_sha256
+
+SEGMENTS_HEADER = ["start_t", "end_t", "state", "phi_T", "row_count"]
+
+class SegmentWriter:
+    # Emits one CSV row per run of identical state while rows are pushed;
+    # sha256 is the file's digest once closed.
+    def __init__(self, path: str):
+        self.path = path
+        self.sha256 = None
+        self._f = open_hashed(path, newline="")
+        self._w = csv.writer(self._f)
+        self._w.writerow(SEGMENTS_HEADER)
+        self.segments = 0
+        self._state = None
+        self._phi = None
+        self._start_t = None
+        self._end_t = None
+        self._count = 0
+
+    def push(self, t: float, state: str, phi: str) -> None:
+        if state != self._state:
+            self._flush()
+            self._state = state
+            self._phi = phi
+            self._start_t = t
+            self._count = 0
+        self._end_t = t
+        self._count += 1
+
+    def extend(self, ts: list, states: list, collapses: list) -> None:
+        for i in range(len(ts)):
+            self.push(ts[i], states[i], collapses[i])
+
+    def _flush(self) -> None:
+        if self._count == 0:
+            return
+        self._w.writerow([
+            f"{self._start_t:.6f}",
+            f"{self._end_t:.6f}",
+            self._state,
+            self._phi,
+            str(self._count),
+        ])
+        self.segments += 1
+
+    def close(self) -> None:
+        self._flush()
+        self._count = 0
+        self._f.close()
+        self.sha256 = written_sha256(self._f)
+
+    def discard(self) -> None:
+        # Abandon the output: close and remove the partial segments file.
+        self._f.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def iter_segments(path: str):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        r = csv.reader(f)
+        header = next(r, None)
+        if header != SEGMENTS_HEADER:
+            raise ValueError(f"Segments CSV header must be: {','.join(SEGMENTS_HEADER)}")
+        line_no = 1
+        for row in r:
+            line_no += 1
+            if len(row) != len(SEGMENTS_HEADER):
+                raise ValueError(f"Malformed segment on line {line_no}")
+            try:
+                n = int(row[4])
+            except ValueError:
+                raise ValueError(f"Invalid row_count on line {line_no}: {row[4]}")
+            if n < 1:
+                raise ValueError(f"Invalid row_count on line {line_no}: {row[4]}")
+            yield row[0], row[1], row[2], row[3], n
+
+def expand_segments(path: str, ts):
+    # Expand segments back to per-row (t, state, phi_T), aligned with the
+    # original t sequence (e.g. the classifier input). Boundaries are checked.
+    it = iter(ts)
+    for start_t, end_t, state, phi, n in iter_segments(path):
+        for k in range(n):
+            try:
+                t = next(it)
+            except StopIteration:
+                raise ValueError("t sequence is shorter than the segments row_count total")
+            t_txt = f"{t:.6f}"
+            if (k == 0 and t_txt != start_t) or (k == n - 1 and t_txt != end_t):
+                raise ValueError(f"t mismatch at segment boundary: t={t_txt} segment={start_t}..{end_t}")
+            yield t, state, phi
+    for _ in it:
+        raise ValueError("t sequence is longer than the segments row_count total")
+
+def read_t_column(path: str) -> list:
+    ts = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        r = csv.DictReader(f)
+        if r.fieldnames is None or "t" not in [x.strip() for x in r.fieldnames]:
+            raise ValueError("CSV missing required column: t")
+        line_no = 1
+        for row in r:
+            line_no += 1
+            x = (row.get("t") or "").strip()
+            try:
+                ts.append(float(x))
+            except ValueError:
+                raise ValueError(f"Invalid float for t on line {line_no}: {x}")
+    return ts
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in_segments", required=True, help="stl_segments_out.csv written by stl_t5_classifier_v1_0.py")
+    ap.add_argument("--t_csv", required=True, help="CSV with the original t column (e.g. classifier input)")
+    ap.add_argument("--out_dir", required=True, help="Output directory for the per-row expansion + manifest")
+    args = ap.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    out_csv = os.path.join(args.out_dir, "stl_segments_expanded.csv")
+    rows = 0
+    with open_hashed(out_csv, newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["t", "state", "phi_T"])
+        for t, state, phi in expand_segments(args.in_segments, read_t_column(args.t_csv)):
+            w.writerow([f"{t:.6f}", state, phi])
+            rows += 1
+    write_manifest(args.out_dir, ["stl_segments_expanded.csv"], {"stl_segments_expanded.csv": written_sha256(f)})
+
+    print(f"WROTE: {out_csv} ({rows} rows)")
+    print(f"WROTE: {os.path.join(args.out_dir, 'MANIFEST.sha256')}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())